@@ -13,6 +13,7 @@ Only variables actually used in the codebase are included.
 GAUSSIAN_BLUR_KERNEL = (5, 5)
 THRESHOLD_VALUE = 150
 MARGIN_CROP_RATIO = 0.02
+USE_OPENCL = False  # Offload blur + threshold via cv2.UMat (GPU results may differ slightly from CPU)
 
 # Step 2: Corner detection and grid analysis
 CORNER_REGION_RATIO_X = 5
@@ -20,6 +21,7 @@ CORNER_REGION_RATIO_Y = 5
 CELL_SIZE_RATIO = 0.003
 WHITE_CELL_THRESHOLD = 70
 SYNTHETIC_MARKER_SIZE_RATIO = 0.004
+CORNER_DETECTION_PYRAMID_LEVELS = 0  # Detect on a 1/2**N downsampled binary (0 = full resolution)
 
 # Step 3: Corner verification
 CORNER_VERIFICATION_TOLERANCE_RATIO = 0.02  # Relative to image diagonal
@@ -29,6 +31,8 @@ CORNER_VERIFICATION_CIRCLE_RADIUS_RATIO = 0.015  # Relative to image diagonal
 # Step 4: Output cropping
 OUTPUT_WIDTH = 800
 OUTPUT_HEIGHT = 1200
+PERSPECTIVE_MAP_CACHE_SIZE = 0  # Remap tables kept for exactly repeated corner geometries (0 = off, e.g. 16 for a fixed rig)
+PERSPECTIVE_MAP_QUANTUM = 1  # Snap corners to this many px for cache keys (>1 shares maps but changes output)
 
 # =============================================================================
 # VISUALIZATION SETTINGS
@@ -71,9 +75,17 @@ COLOR_CYAN_ARROWS = (0, 255, 255)
 
 # Operation modes
 DEBUG_MODE = True
+LOG_LEVEL = "INFO"  # Progress messages; "WARNING" silences per-step output in batch runs
 
 # File handling
 SUPPORTED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
+REDUCED_DECODE_MIN_WIDTH = None  # Opt-in: decode JPEGs wider than this at 1/2, 1/4 or 1/8 scale (lossy, e.g. 2500)
+STEP_JPEG_QUALITY = 85  # JPEG quality for debug step images
+
+# Directory processing
+DIRECTORY_WORKERS = None  # Worker processes for directory runs (None = half the CPU cores, 1 = sequential)
+WORKER_OPENCV_THREADS = 2  # OpenCV threads per worker process
+READAHEAD_FILES = 16  # Files kept ahead in the page cache via posix_fadvise (0 = off)
 
 # Directory structure
 tmp_dir = "tmp"
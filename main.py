@@ -16,80 +16,118 @@ Usage:
 import os
 import sys
 import argparse
+import logging
+import multiprocessing as mp
+import queue
+import stat
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 import cv2
+import numpy as np
 
 # Import pipeline steps
-from pipeline.step_1_preprocess import preprocess_image
-from pipeline.step_2_corner_detection import find_markers
+from pipeline.step_1_preprocess import preprocess_image, downsample_binary
+from pipeline.step_2_corner_detection import find_markers, build_white_mask
 from pipeline.step_3_corner_verification import verify_corners
 from pipeline.step_4_cropping import detect_markers
+from pipeline._io import write_jpeg
+from pipeline._geom import contour_center
 
 import config
 
+log = logging.getLogger(__name__)
+
 
 class OMRPipeline:
     """Main pipeline orchestrator for OMR sheet processing."""
 
-    def __init__(self, input_path, debug=True):
-        """Initialize pipeline with input path and debug settings."""
-        self.input_path = Path(input_path)
+    def __init__(self, input_path, debug=True, image=None, writer=None, directories=None):
+        """Initialize pipeline with input path, debug settings and optional pre-decoded image.
+
+        Output and step images are encoded and written on a background writer. A
+        shared `writer` executor may be passed in (directory mode); otherwise each
+        run_pipeline call starts its own and shuts it down before returning. Either
+        way run_pipeline waits for its writes before returning.
+        `directories` is a pre-created (tmp_dir, output_dir, steps_dir) tuple
+        from setup_directories(); when omitted the pipeline creates them itself.
+        """
         self.debug = debug
-        self.base_name = self.input_path.stem
+        self.set_input(input_path, image)
 
-        # Setup directory structure
-        self._setup_directories()
+        # Background image writer (set for the duration of each run)
+        self._shared_writer = writer
+        self._writer = None
+        self._pending_writes = []
 
-    def _setup_directories(self):
-        """Create necessary directories for pipeline output with proper error handling."""
-        self.tmp_dir = Path("tmp")
-        self.output_dir = self.tmp_dir / "output"
-        self.steps_dir = self.tmp_dir / "steps"
+        # Setup directory structure
+        self.tmp_dir, self.output_dir, self.steps_dir = directories or setup_directories()
 
-        # Always create directories (handles existing directories gracefully)
-        try:
-            for directory in [self.tmp_dir, self.output_dir, self.steps_dir]:
-                directory.mkdir(parents=True, exist_ok=True)
-        except Exception as e:
-            print(f"⚠️  Warning: Could not create directories: {e}")
-            # Continue anyway - individual steps will try to create dirs as needed
+    def set_input(self, input_path, image=None):
+        """Point the pipeline at another input, keeping its writer and directories."""
+        self.input_path = Path(input_path)
+        self._input_str = str(self.input_path)
+        self.image = image
+        self.base_name = self.input_path.stem
+        self._white_mask = None
 
     def run_pipeline(self):
         """Execute the complete 4-step pipeline."""
-        print(f"🚀 Starting OMR pipeline for: {self.input_path}")
-        start_time = time.time()
+        log.info("🚀 Starting OMR pipeline for: %s", self.input_path)
+        start_time = time.perf_counter()
+
+        # Queue writes on the shared writer, or on one started for this run
+        self._writer = self._shared_writer
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=2)
 
         try:
             # Load and validate input image
             original_image = self._load_image()
-            print(f"📸 Loaded image: {original_image.shape}")
+            log.info("📸 Loaded image: %s", original_image.shape)
 
             # Determine base name for outputs
             step_base_name = self._get_step_base_name()
 
             # Execute pipeline steps
             binary_image, cropped_image = self._run_preprocessing(original_image, step_base_name)
-            contours = self._run_corner_detection(binary_image, cropped_image, step_base_name)
-            verified_contours = self._run_corner_verification(contours, cropped_image, step_base_name)
-            final_image = self._run_cropping(verified_contours, cropped_image, step_base_name)
+            contours, cells = self._run_corner_detection(binary_image, cropped_image, step_base_name)
+            verified_contours, corner_points, corner_labels = self._run_corner_verification(
+                contours, cells, binary_image, cropped_image, step_base_name
+            )
+            final_image = self._run_cropping(
+                verified_contours, corner_points, corner_labels, cropped_image, step_base_name
+            )
 
             # Save final output
             self._save_final_output(final_image, step_base_name)
 
-            # Report completion
-            elapsed = time.time() - start_time
-            print(f"✅ Pipeline completed successfully in {elapsed:.2f}s")
-
-            return True
-
         except Exception as e:
-            print(f"❌ Pipeline failed: {str(e)}")
+            log.error("❌ Pipeline failed: %s", e)
             return False
 
+        finally:
+            self._wait_for_writes()
+
+        # Report completion
+        elapsed = time.perf_counter() - start_time
+        log.info("✅ Pipeline completed successfully in %.2fs", elapsed)
+
+        return True
+
     def _load_image(self):
-        """Load and validate input image."""
-        image = cv2.imread(str(self.input_path))
+        """Load and validate input image, reusing a pre-decoded image when provided."""
+        if self.image is not None:
+            return self.image
+
+        try:
+            with open(self._input_str, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+
+        image = decode_image(data)
         if image is None:
             raise ValueError(f"Could not load image: {self.input_path}")
         return image
@@ -98,119 +136,287 @@ class OMRPipeline:
         """Get base name for step outputs, including missing corner test mode."""
         if config.FORCE_MISSING_CORNER:
             step_base_name = f"{self.base_name}_missing_{config.FORCE_MISSING_CORNER.lower()}"
-            print(f"🔧 Missing corner test mode: Using base name '{step_base_name}'")
+            log.info("🔧 Missing corner test mode: Using base name '%s'", step_base_name)
             return step_base_name
         return self.base_name
 
     def _run_preprocessing(self, original_image, step_base_name):
         """Execute Step 1: Preprocessing and thresholding."""
-        print("🔄 Step 1: Preprocessing + Thresholding...")
+        log.info("🔄 Step 1: Preprocessing + Thresholding...")
 
         # Run preprocessing pipeline
-        preprocessed_vis, binary_image, crop_info = preprocess_image(original_image)
+        preprocessed_vis, binary_image, crop_info = preprocess_image(
+            original_image, build_visualization=self.debug
+        )
 
         # Save debug visualization if enabled
         if self.debug:
             self._save_step_image(preprocessed_vis, f"{step_base_name}_step_1_preprocessed_thresholded.jpg")
 
-        # Create cropped color image for visualization
-        cropped_image = self._apply_margin_crop_to_original(original_image)
+        # Margin-cropped color view computed by step 1 (no copy)
+        cropped_image = crop_info['cropped_color']
 
-        return binary_image, cropped_image
+        # Optionally detect corners on a coarser pyramid level
+        levels = config.CORNER_DETECTION_PYRAMID_LEVELS
+        self._detection_scale = 2 ** levels
+        if levels:
+            binary_image = downsample_binary(binary_image, levels)
+            log.info("   ✓ Corner detection on pyramid level %s: %s", levels, binary_image.shape)
 
-    def _apply_margin_crop_to_original(self, original_image):
-        """Apply same margin crop to original color image for visualization."""
-        margin_x = int(original_image.shape[1] * config.MARGIN_CROP_RATIO)
-        margin_y = int(original_image.shape[0] * config.MARGIN_CROP_RATIO)
-        return original_image[margin_y:original_image.shape[0]-margin_y,
-                            margin_x:original_image.shape[1]-margin_x]
+        return binary_image, cropped_image
 
     def _run_corner_detection(self, binary_image, cropped_image, step_base_name):
         """Execute Step 2: Corner detection with potential recalculation."""
-        print("🔄 Step 2: Finding markers...")
+        log.info("🔄 Step 2: Finding markers...")
+
+        # Shared by the initial detection and a possible recalculation
+        self._white_mask = build_white_mask(binary_image)
 
         # Initial corner detection
-        _, contours = find_markers(binary_image, cropped_image.copy(), step_base_name)
+        return self._find_markers(binary_image, cropped_image, step_base_name)
+
+    def _find_markers(self, binary_image, cropped_image, base_name, missing_corner=None):
+        """Run step 2 and map contours and cells from the detection pyramid level back to full resolution."""
+        _, contours, cells = find_markers(binary_image, cropped_image, base_name,
+                                          white_mask=self._white_mask, missing_corner=missing_corner,
+                                          save_image=self._queue_step_image)
 
-        return contours
+        scale = self._detection_scale
+        if scale != 1:
+            contours = [contour * scale for contour in contours]
+            # Corner points stay the centroids of the (now scaled) contours
+            cells = [dict(cell, center=contour_center(contour)
+                          or (cell['center'][0] * scale, cell['center'][1] * scale))
+                     for cell, contour in zip(cells, contours)]
 
-    def _run_corner_verification(self, contours, cropped_image, step_base_name):
-        """Execute Step 3: Corner verification with recalculation if needed."""
-        print("🔄 Step 3: Verifying corners...")
+        return contours, cells
 
-        # Verify corners
-        _, verified_contours, needs_recalculation = verify_corners(
-            contours, cropped_image.copy(), step_base_name
+    def _run_corner_verification(self, contours, cells, binary_image, cropped_image, step_base_name):
+        """Execute Step 3: Corner verification with recalculation if needed.
+
+        Returns the verified contours with their corner points and labels for step 4.
+        """
+        log.info("🔄 Step 3: Verifying corners...")
+
+        # Verify corners using the centers and labels found in step 2
+        (_, verified_contours, needs_recalculation, missing_label,
+         corner_points, corner_labels) = verify_corners(
+            contours, cropped_image, step_base_name, cells=cells,
+            save_image=self._queue_step_image
         )
 
         # Handle recalculation if needed
         if needs_recalculation:
-            verified_contours = self._handle_recalculation(cropped_image, step_base_name)
-
-        return verified_contours
+            return self._handle_recalculation(binary_image, cropped_image, step_base_name,
+                                              missing_label)
 
-    def _handle_recalculation(self, cropped_image, step_base_name):
-        """Handle corner recalculation when verification fails."""
-        print("🔄 Step 2 (Iteration 2): Recalculating with missing corners...")
+        return verified_contours, corner_points, corner_labels
 
-        # Get binary image for recalculation
-        binary_image = self._get_binary_for_recalculation(cropped_image)
+    def _handle_recalculation(self, binary_image, cropped_image, step_base_name, missing_label):
+        """Handle corner recalculation when verification fails; returns contours, points and labels."""
+        log.info("🔄 Step 2 (Iteration 2): Recalculating with missing corners...")
 
-        # Run corner detection again
-        _, recalculated_contours = find_markers(
-            binary_image, cropped_image.copy(), f"{step_base_name}_iter2"
+        # Run corner detection again on the step 1 binary image without the failed corner
+        recalculated_contours, cells = self._find_markers(
+            binary_image, cropped_image, f"{step_base_name}_iter2", missing_corner=missing_label
         )
 
-        # Reset missing corner flag and skip verification
-        config.FORCE_MISSING_CORNER = None
-        print("⏭️  Step 3: Skipped in iteration 2 (corners already verified)")
-
-        return recalculated_contours
+        # Skip verification
+        log.info("⏭️  Step 3: Skipped in iteration 2 (corners already verified)")
 
-    def _get_binary_for_recalculation(self, cropped_image):
-        """Get binary image for recalculation by reprocessing cropped image."""
-        # Quick preprocessing for recalculation
-        gray = cv2.cvtColor(cropped_image, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, config.GAUSSIAN_BLUR_KERNEL, 0)
-        _, binary = cv2.threshold(blurred, config.THRESHOLD_VALUE, 255, cv2.THRESH_BINARY_INV)
-        return binary
+        return (recalculated_contours, [cell['center'] for cell in cells],
+                [cell['corner'] for cell in cells])
 
-    def _run_cropping(self, verified_contours, cropped_image, step_base_name):
+    def _run_cropping(self, verified_contours, corner_points, corner_labels, cropped_image,
+                      step_base_name):
         """Execute Step 4: Final cropping and perspective transformation."""
-        print("🔄 Step 4: Detecting markers and cropping...")
+        log.info("🔄 Step 4: Detecting markers and cropping...")
 
-        # Perform cropping
+        # Perform cropping on the corner points and labels step 3 already has
         _, cropped_img = detect_markers(
-            verified_contours, cropped_image.copy(), None, step_base_name
+            verified_contours, cropped_image, None, step_base_name,
+            corner_points=corner_points, corner_labels=corner_labels,
+            save_image=self._queue_step_image
         )
 
         return cropped_img
 
     def _save_final_output(self, final_image, step_base_name):
-        """Save the final cropped image with automatic overwrite."""
-        # Always ensure output directory exists (handles existing directories gracefully)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-
+        """Queue the final cropped image for writing with automatic overwrite."""
         output_filename = f"{step_base_name}_cropped.jpg"
         output_path = self.output_dir / output_filename
 
-        # cv2.imwrite automatically overwrites existing files
-        success = cv2.imwrite(str(output_path), final_image)
-        if success:
-            print(f"📁 Final cropped image saved to: {output_path}")
-        else:
-            print(f"❌ Failed to save final image to: {output_path}")
+        # The pipeline never touches final_image again, so no copy is needed
+        self._pending_writes.append(
+            self._writer.submit(_write_final_image, str(output_path), final_image)
+        )
 
     def _save_step_image(self, image, filename):
-        """Save intermediate step image for debugging with automatic overwrite."""
-        # Always ensure steps directory exists (handles existing directories gracefully)
-        self.steps_dir.mkdir(parents=True, exist_ok=True)
+        """Queue intermediate step image for debugging with automatic overwrite."""
+        step_path = self.steps_dir / filename
+        self._pending_writes.append(
+            self._writer.submit(_write_step_image, str(step_path), image)
+        )
 
+    def _queue_step_image(self, image, filename, write_func):
+        """Queue a step 2-4 image on this pipeline's writer (copied, as the steps keep drawing on it)."""
         step_path = self.steps_dir / filename
-        # cv2.imwrite automatically overwrites existing files
-        success = cv2.imwrite(str(step_path), image)
-        if not success:
-            print(f"   ⚠️  Warning: Failed to save step image: {step_path}")
+        self._pending_writes.append(
+            self._writer.submit(write_func, str(step_path), image.copy())
+        )
+
+    def _wait_for_writes(self):
+        """Block until the writes queued by this run finish, then shut down a writer the run started."""
+        wait(self._pending_writes)
+        self._pending_writes = []
+        if self._shared_writer is None:
+            self._writer.shutdown(wait=True)
+        self._writer = None
+
+
+def setup_directories(tmp_dir="tmp"):
+    """Create the pipeline output directories once and return (tmp_dir, output_dir, steps_dir)."""
+    tmp_dir = Path(tmp_dir)
+    directories = (tmp_dir, tmp_dir / "output", tmp_dir / "steps")
+
+    # Always create directories (handles existing directories gracefully)
+    try:
+        for directory in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+    except Exception as e:
+        log.warning("⚠️  Warning: Could not create directories: %s", e)
+        # Continue anyway - failed writes are reported when images are saved
+
+    return directories
+
+
+def _write_final_image(output_path, image):
+    """Encode and write the final image (cv2.imwrite automatically overwrites existing files)."""
+    if cv2.imwrite(output_path, image):
+        log.info("📁 Final cropped image saved to: %s", output_path)
+    else:
+        log.error("❌ Failed to save final image to: %s", output_path)
+
+
+def _write_step_image(step_path, image):
+    """Encode a debug image at reduced JPEG quality and write it (runs on the background writer)."""
+    if not write_jpeg(step_path, image):
+        log.warning("   ⚠️  Warning: Failed to save step image: %s", step_path)
+
+
+_REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def decode_image(data):
+    """
+    Decode encoded image bytes into a BGR image.
+
+    When config.REDUCED_DECODE_MIN_WIDTH is set, wider JPEGs are decoded at
+    1/2, 1/4 or 1/8 resolution through libjpeg's DCT scaling, halving while the
+    width still exceeds the limit. Everything else is decoded at full resolution.
+    The crop is warped to OUTPUT_WIDTH x OUTPUT_HEIGHT either way, so callers
+    never need the reduction factor.
+
+    Returns:
+        numpy.ndarray or None: The decoded image
+    """
+    if not data:
+        return None
+
+    scale = 1
+    limit = config.REDUCED_DECODE_MIN_WIDTH
+    width = _jpeg_width(data) if limit else None
+    if width:
+        while scale < 8 and width / scale > limit:
+            scale *= 2
+
+    if scale > 1:
+        log.info("   ✓ Decoding at 1/%s resolution (JPEG DCT scaling)", scale)
+    return cv2.imdecode(np.frombuffer(data, np.uint8), _REDUCED_COLOR_FLAGS[scale])
+
+
+def _jpeg_width(data):
+    """Read the pixel width from a JPEG SOF header without decoding (None if not a JPEG)."""
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    pos = 2
+    while pos + 9 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+        elif 0xD0 <= marker <= 0xD9 or marker == 0x01:  # Markers without a length field
+            pos += 2
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):  # Start of frame
+            return int.from_bytes(data[pos + 7:pos + 9], "big")
+        else:
+            pos += 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+    return None
+
+
+class Readahead:
+    """Ask the kernel to pre-read upcoming files with posix_fadvise(WILLNEED)."""
+
+    def __init__(self, paths, depth):
+        """Advise the first `depth` paths; later ones are advised by advance()."""
+        self.paths = list(paths)
+        self.depth = depth if hasattr(os, "posix_fadvise") else 0
+        for path in self.paths[:self.depth]:
+            _advise_willneed(path)
+
+    def advance(self, index):
+        """Called after file `index` is done: advise the file `depth` positions ahead."""
+        if self.depth and index + self.depth < len(self.paths):
+            _advise_willneed(self.paths[index + self.depth])
+
+
+def _advise_willneed(path):
+    """Start asynchronous readahead of a whole file; failures are ignored (advisory only)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class PrefetchLoader:
+    """Read and decode images on a background thread ahead of the pipeline."""
+
+    def __init__(self, paths, queue_size=8):
+        """Start prefetching the given paths into a bounded queue."""
+        self.paths = list(paths)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._prefetch, daemon=True)
+        self._thread.start()
+
+    def _prefetch(self):
+        """Read each file with a single read() call and decode it from memory."""
+        for path in self.paths:
+            image = None
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                image = decode_image(data)
+            except OSError as e:
+                log.warning("⚠️  Warning: Could not read %s: %s", path, e)
+            self._queue.put((path, image))
+
+    def __iter__(self):
+        """Yield (path, image) tuples in input order; image is None if decoding failed."""
+        for _ in self.paths:
+            yield self._queue.get()
 
 
 def create_argument_parser():
@@ -254,66 +460,151 @@ def configure_from_args(args):
     if args.missing_corner:
         config.ENABLE_MISSING_CORNER_CALCULATION = True
         config.FORCE_MISSING_CORNER = args.missing_corner
-        print(f"🔧 Forcing {args.missing_corner} corner as missing for testing")
+        log.info("🔧 Forcing %s corner as missing for testing", args.missing_corner)
     else:
         config.FORCE_MISSING_CORNER = None
 
 
-def process_single_file(file_path):
-    """Process a single image file."""
-    pipeline = OMRPipeline(file_path, debug=config.DEBUG_MODE)
+def process_single_file(file_path, image=None, writer=None, directories=None):
+    """Process a single image file, optionally with an already-decoded image, shared writer and directories."""
+    pipeline = OMRPipeline(file_path, debug=config.DEBUG_MODE, image=image,
+                           writer=writer, directories=directories)
     return pipeline.run_pipeline()
 
 
+# Settings that must reach worker processes explicitly (see process_directory)
+_WORKER_SETTING_NAMES = (
+    'DEBUG_MODE',
+    'ENABLE_MISSING_CORNER_CALCULATION',
+    'FORCE_MISSING_CORNER',
+    'LOG_LEVEL',
+)
+
+_worker_directories = None
+
+
+def _capture_worker_settings():
+    """Snapshot the run settings that worker processes need."""
+    return {name: getattr(config, name) for name in _WORKER_SETTING_NAMES}
+
+
+def _init_worker(settings, directories):
+    """Initialize a directory worker process."""
+    global _worker_directories
+    # Each worker gets a share of the cores; keep OpenCV from oversubscribing them
+    cv2.setNumThreads(config.WORKER_OPENCV_THREADS)
+    for name, value in settings.items():
+        setattr(config, name, value)
+    configure_logging(settings['LOG_LEVEL'])
+    _worker_directories = directories
+
+
+def _worker_context():
+    """
+    Multiprocessing context for directory workers.
+
+    Workers must not be forked from this process: its thread pools (and OpenCV's
+    and Numba's native ones) do not survive fork(). Where supported they fork
+    from a clean server that already imported the pipeline; otherwise they are spawned.
+    """
+    if 'forkserver' in mp.get_all_start_methods():
+        context = mp.get_context('forkserver')
+        context.set_forkserver_preload(['main'])
+        return context
+    return mp.get_context('spawn')
+
+
+def _process_file_in_worker(file_path):
+    """Process one file inside a worker process using the settings of the run."""
+    log.info("\n%s", '='*50)
+    return process_single_file(file_path, directories=_worker_directories)
+
+
 def process_directory(input_dir):
     """Process all images in a directory."""
     input_path = Path(input_dir)
 
     if not input_path.is_dir():
-        print(f"❌ Directory not found: {input_dir}")
+        log.error("❌ Directory not found: %s", input_dir)
         return False
 
-    # Find all supported image files
-    image_files = []
-    for ext in config.SUPPORTED_EXTENSIONS:
-        image_files.extend(input_path.glob(f"*{ext}"))
-        image_files.extend(input_path.glob(f"*{ext.upper()}"))
+    # Find all supported image files in a single directory pass (case-insensitive)
+    extensions = frozenset(ext.lower() for ext in config.SUPPORTED_EXTENSIONS)
+    with os.scandir(input_path) as entries:
+        image_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions
+        )
 
     if not image_files:
-        print(f"❌ No image files found in: {input_dir}")
+        log.error("❌ No image files found in: %s", input_dir)
         return False
 
-    print(f"📂 Found {len(image_files)} image(s) to process")
-
-    # Process each file
-    success_count = 0
-    for file_path in image_files:
-        print(f"\n{'='*50}")
-        if process_single_file(file_path):
-            success_count += 1
+    log.info("📂 Found %s image(s) to process", len(image_files))
+
+    directories = setup_directories()
+    workers = config.DIRECTORY_WORKERS or (os.cpu_count() or 2) // 2
+    workers = max(1, min(workers, len(image_files)))
+
+    # Warm the page cache for the first files; each finished file advises the next one
+    readahead = Readahead(image_files, config.READAHEAD_FILES)
+
+    if workers > 1:
+        # Files are independent, so process them in separate worker processes.
+        # Worker processes do not share this process's config module, so the
+        # run settings are handed to each worker explicitly.
+        settings = _capture_worker_settings()
+        success_count = 0
+        context = _worker_context()
+        with context.Pool(workers, initializer=_init_worker, initargs=(settings, directories)) as pool:
+            for i, result in enumerate(pool.imap(_process_file_in_worker, image_files)):
+                if result:
+                    success_count += 1
+                readahead.advance(i)
+    else:
+        # Process each file while the next ones are read and decoded in the background
+        # and finished images are encoded and written by a shared writer
+        success_count = 0
+        writer = ThreadPoolExecutor(max_workers=2)
+        try:
+            for i, (file_path, image) in enumerate(PrefetchLoader(image_files)):
+                log.info("\n%s", '='*50)
+                if process_single_file(file_path, image, writer, directories):
+                    success_count += 1
+                readahead.advance(i)
+        finally:
+            writer.shutdown(wait=True)
 
     # Report results
-    print(f"\n🎯 Processing complete: {success_count}/{len(image_files)} successful")
+    log.info("\n🎯 Processing complete: %s/%s successful", success_count, len(image_files))
     return success_count == len(image_files)
 
 
 def validate_input_path(input_path):
     """Validate that input path exists and is accessible."""
-    path = Path(input_path)
-
-    if not path.exists():
-        print(f"❌ Input path not found: {input_path}")
+    # A single stat() answers both "exists" and "file or directory"
+    try:
+        mode = os.stat(input_path).st_mode
+    except OSError:
+        log.error("❌ Input path not found: %s", input_path)
         return False
 
-    if not (path.is_file() or path.is_dir()):
-        print(f"❌ Invalid input path: {input_path}")
+    if not (stat.S_ISREG(mode) or stat.S_ISDIR(mode)):
+        log.error("❌ Invalid input path: %s", input_path)
         return False
 
     return True
 
 
+def configure_logging(level=None):
+    """Send pipeline progress messages to stdout at `level` (default config.LOG_LEVEL); no-op if already configured."""
+    logging.basicConfig(level=level or config.LOG_LEVEL, format="%(message)s", stream=sys.stdout)
+
+
 def main():
     """Main entry point for the application."""
+    configure_logging()
+
     # Parse command line arguments
     parser = create_argument_parser()
     args = parser.parse_args()
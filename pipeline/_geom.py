@@ -0,0 +1,209 @@
+"""
+Small geometry helpers shared by the pipeline steps.
+"""
+
+import cv2
+import numpy as np
+from pipeline._jit import NUMBA_AVAILABLE, njit
+
+# Corner labels in clockwise order; quadrant codes below index into this
+CLOCKWISE_LABELS = ("TL", "TR", "BR", "BL")
+
+
+def contour_center(contour):
+    """
+    Integer centroid of a contour, or None if the contour has no area.
+
+    Step 2 contours are axis-aligned squares, whose centroid is simply the mean
+    of the four points; other integer polygons use the shoelace formula and
+    float contours fall back to cv2.moments.
+
+    Args:
+        contour (numpy.ndarray): Contour of shape (N, 1, 2) or (N, 2)
+
+    Returns:
+        tuple: (cx, cy) or None
+    """
+    points = contour.reshape(-1, 2)
+    if len(points) == 4:
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points.tolist()
+        if y0 == y1 and x1 == x2 and y2 == y3 and x3 == x0:
+            if x0 == x1 or y0 == y2:
+                return None
+            return (x0 + x1 + x2 + x3) // 4, (y0 + y1 + y2 + y3) // 4
+
+    if not np.issubdtype(points.dtype, np.integer):
+        M = cv2.moments(contour)
+        if M["m00"] == 0:
+            return None
+        return int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"])
+
+    return _polygon_centroid(points.astype(np.int64))
+
+
+def _polygon_centroid(points):
+    """
+    Integer area centroid of an integer polygon via the shoelace formula.
+
+    Only m00, m10 and m01 are computed, with the same scaling as cv2.moments,
+    so results match int(m10 / m00), int(m01 / m00) exactly.
+    """
+    x, y = points[:, 0], points[:, 1]
+    next_x, next_y = np.roll(x, -1), np.roll(y, -1)
+    cross = x * next_y - next_x * y
+
+    m00 = float(cross.sum()) * 0.5
+    if m00 == 0:
+        return None
+    m10 = float(((x + next_x) * cross).sum()) * (1.0 / 6)
+    m01 = float(((y + next_y) * cross).sum()) * (1.0 / 6)
+    if m00 < 0:  # Clockwise contour
+        m00, m10, m01 = -m00, -m10, -m01
+    return int(m10 / m00), int(m01 / m00)
+
+
+def contour_centers(contours):
+    """
+    Integer centroids of several contours, skipping contours with no area.
+
+    Equivalent to contour_center() per contour, but the axis-aligned squares
+    from Step 2 are handled together in a few NumPy operations.
+
+    Args:
+        contours: Sequence of contours of shape (N, 1, 2) or (N, 2)
+
+    Returns:
+        list: (cx, cy) tuples in contour order
+    """
+    if not contours or any(contour.size != 8 for contour in contours):
+        centers = (contour_center(contour) for contour in contours)
+        return [center for center in centers if center is not None]
+
+    points = np.stack([contour.reshape(4, 2) for contour in contours]).astype(np.int64)
+    x, y = points[..., 0], points[..., 1]
+    is_square = ((y[:, 0] == y[:, 1]) & (x[:, 1] == x[:, 2])
+                 & (y[:, 2] == y[:, 3]) & (x[:, 3] == x[:, 0]))
+    has_area = (x[:, 0] != x[:, 1]) & (y[:, 0] != y[:, 2])
+    centers = (points.sum(axis=1) // 4).tolist()
+
+    result = []
+    for i, contour in enumerate(contours):
+        if is_square[i]:
+            if has_area[i]:
+                result.append(tuple(centers[i]))
+        else:
+            center = contour_center(contour)
+            if center is not None:
+                result.append(center)
+    return result
+
+
+def classify_corners(corners):
+    """
+    Label each corner TL, TR, BR or BL relative to the centroid of all corners.
+
+    Points on a centre line fall through to BL. Works the same for fewer than 4 corners.
+
+    Args:
+        corners: Sequence of (x, y) points
+
+    Returns:
+        list: Label per corner
+    """
+    points = np.array(corners)
+    if NUMBA_AVAILABLE:
+        codes = _classify_kernel(points[:, 0], points[:, 1])
+        return [CLOCKWISE_LABELS[code] for code in codes.tolist()]
+
+    x, y = points[:, 0], points[:, 1]
+    center_x = np.mean(x)
+    center_y = np.mean(y)
+
+    # Classify all corners at once
+    left, right = x < center_x, x > center_x
+    top, bottom = y < center_y, y > center_y
+    labels = np.select([left & top, right & top, right & bottom], ["TL", "TR", "BR"], "BL")
+    return labels.tolist()
+
+
+def clockwise_picks(corners):
+    """
+    Pick one corner per quadrant around the centroid, in TL, TR, BR, BL order.
+
+    Points on a centre line count as left/top. Within a quadrant the most extreme
+    point wins (TL: min x+y, TR: max x-y, BR: max x+y, BL: min y-x); ties go to
+    the first point.
+
+    Args:
+        corners: Sequence of (x, y) points
+
+    Returns:
+        list: Indices into corners of the picks of the non-empty quadrants
+    """
+    points = np.array(corners)
+    if NUMBA_AVAILABLE:
+        picks = _clockwise_picks_kernel(points[:, 0], points[:, 1])
+        return [i for i in picks.tolist() if i >= 0]
+
+    x, y = points[:, 0], points[:, 1]
+    right, bottom = x > np.mean(x), y > np.mean(y)
+    sums, diffs = x + y, x - y
+    quadrants = (
+        (~right & ~bottom, sums, np.argmin),   # Top-left: minimize distance to (0,0)
+        (right & ~bottom, diffs, np.argmax),   # Top-right: maximize x, minimize y
+        (right & bottom, sums, np.argmax),     # Bottom-right: maximize distance from (0,0)
+        (~right & bottom, -diffs, np.argmin),  # Bottom-left: minimize x, maximize y
+    )
+    picks = []
+    for in_quadrant, key, pick in quadrants:
+        indices = np.flatnonzero(in_quadrant)
+        if len(indices):
+            picks.append(int(indices[pick(key[indices])]))
+    return picks
+
+
+@njit(cache=True)
+def _classify_kernel(x, y):
+    """Numba kernel: quadrant code (index into CLOCKWISE_LABELS) per point for classify_corners."""
+    n = len(x)
+    center_x = x.sum() / n
+    center_y = y.sum() / n
+
+    codes = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        if x[i] < center_x and y[i] < center_y:
+            codes[i] = 0
+        elif x[i] > center_x and y[i] < center_y:
+            codes[i] = 1
+        elif x[i] > center_x and y[i] > center_y:
+            codes[i] = 2
+        else:
+            codes[i] = 3
+    return codes
+
+
+@njit(cache=True)
+def _clockwise_picks_kernel(x, y):
+    """Numba kernel: index picked per quadrant for clockwise_picks (-1 when empty)."""
+    n = len(x)
+    center_x = x.sum() / n
+    center_y = y.sum() / n
+
+    picks = np.full(4, -1, dtype=np.int64)
+    keys = np.zeros(4, dtype=x.dtype)
+    for i in range(n):
+        right = x[i] > center_x
+        bottom = y[i] > center_y
+        # Every quadrant maximizes its key
+        if not right and not bottom:
+            quadrant, key = 0, -(x[i] + y[i])
+        elif right and not bottom:
+            quadrant, key = 1, x[i] - y[i]
+        elif right and bottom:
+            quadrant, key = 2, x[i] + y[i]
+        else:
+            quadrant, key = 3, x[i] - y[i]
+        if picks[quadrant] < 0 or key > keys[quadrant]:
+            picks[quadrant] = i
+            keys[quadrant] = key
+    return picks
@@ -0,0 +1,61 @@
+"""
+Step image writing shared by the pipeline steps.
+
+Inside a pipeline run, steps hand finished images to the pipeline's
+save_image callback, which queues them on the pipeline's background writer
+(drained before run_pipeline returns) so JPEG encoding and disk I/O overlap
+with the next step. Steps called on their own write their images immediately.
+"""
+
+import os
+import cv2
+import config
+
+
+def save_step_image(image, filename, write_func, save_image=None):
+    """
+    Save a step image to the steps directory (overwriting existing files).
+
+    Args:
+        image (numpy.ndarray): Image to write
+        filename (str): File name inside the steps directory
+        write_func: Callable(path, image) that encodes, writes and reports the image
+        save_image: Optional callable(image, filename, write_func) of the running pipeline
+            that queues the write on its writer; without one the image is written
+            immediately to config.tmp_dir/config.steps_dir
+    """
+    if save_image is not None:
+        save_image(image, filename, write_func)
+        return
+
+    steps_path = os.path.join(config.tmp_dir, config.steps_dir)
+    # Always create directory structure (handles existing directories gracefully)
+    os.makedirs(steps_path, exist_ok=True)
+    write_func(os.path.join(steps_path, filename), image)
+
+
+def write_jpeg(path, image):
+    """
+    Encode a debug image at config.STEP_JPEG_QUALITY and write it through a raw file descriptor.
+
+    Returns:
+        bool: True if the image was encoded and written
+    """
+    success, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, config.STEP_JPEG_QUALITY])
+    if not success:
+        return False
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    try:
+        fd = os.open(path, flags, 0o644)
+    except OSError:
+        return False
+    try:
+        data = memoryview(buffer)
+        while data:
+            data = data[os.write(fd, data):]
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    return True
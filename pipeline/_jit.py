@@ -0,0 +1,19 @@
+"""
+Optional Numba support shared by the pipeline steps.
+
+Numba is not a hard dependency: when it is missing, NUMBA_AVAILABLE is False
+and every step keeps using its OpenCV/NumPy implementation.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit so kernels can still be defined."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
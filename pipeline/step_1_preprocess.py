@@ -3,46 +3,79 @@ Step 1: Preprocessing
 Complete image preprocessing including margin crop, grayscale, blur, and threshold.
 """
 
+import logging
+from functools import lru_cache
+
 import cv2
 import numpy as np
 import config
+from pipeline._jit import NUMBA_AVAILABLE, njit, prange
+
+log = logging.getLogger(__name__)
+
+# Fixed-point BGR->gray weights (15-bit) matching cv2.cvtColor for 8-bit input
+_GRAY_B, _GRAY_G, _GRAY_R, _GRAY_SHIFT = 3735, 19235, 9798, 15
+
+# Label strip drawn above the step-1 visualization
+_LABEL_HEIGHT = 30
+_LABEL_BASELINE = 20
+_LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_LABEL_SCALE = 0.6
+_LABEL_THICKNESS = 2
+_LABEL_PADDING = 4  # Room for stroke thickness around the measured text box
 
 
 # =============================================================================
 # MAIN PREPROCESSING FUNCTION
 # =============================================================================
 
-def preprocess_image(image):
+def preprocess_image(image, build_visualization=True):
     """
     Complete preprocessing pipeline: margin crop → grayscale → blur → threshold.
 
     Args:
         image (numpy.ndarray): Input BGR image
+        build_visualization (bool): Build the 5-panel debug visualization. When
+            False the intermediate images are never materialized and the fused
+            single-pass kernel produces the binary image directly.
 
     Returns:
-        tuple: (visualization_image, binary_image, crop_info)
+        tuple: (visualization_image or None, binary_image, crop_info)
     """
-    original_image = image.copy()
+    # Read the step settings once and pass them down explicitly
+    margin_ratio = config.MARGIN_CROP_RATIO
+    kernel_size = tuple(config.GAUSSIAN_BLUR_KERNEL)
+    threshold_value = config.THRESHOLD_VALUE
+    use_opencl = config.USE_OPENCL
 
     # Step 1: Apply margin crop
-    cropped_image, crop_info = apply_margin_crop(image, config.MARGIN_CROP_RATIO)
+    cropped_image, crop_info = apply_margin_crop(image, margin_ratio)
+
+    if not build_visualization:
+        # Steps 2-4 fused: grayscale, blur and threshold in a single pass
+        margin_x, margin_y = crop_info['margins'][:2]
+        binary_image = fused_preprocess(image, margin_x, margin_y, threshold_value,
+                                        kernel_size, use_opencl)
+        _print_preprocessing_summary(image, cropped_image, crop_info, kernel_size, threshold_value)
+        return None, binary_image, crop_info
 
     # Step 2: Convert to grayscale
     gray_image = convert_to_grayscale(cropped_image)
 
-    # Step 3: Apply blur
-    blurred_image = apply_gaussian_blur(gray_image)
+    # Step 3: Apply blur (on the GPU via OpenCV's transparent API when enabled)
+    blurred_image = apply_gaussian_blur(_to_device(gray_image, use_opencl), kernel_size)
 
     # Step 4: Apply threshold
-    binary_image = apply_threshold(blurred_image)
+    binary_image = _to_host(apply_threshold(blurred_image, threshold_value))
+    blurred_image = _to_host(blurred_image)
 
     # Create visualization
     visualization = create_preprocessing_visualization(
-        original_image, cropped_image, gray_image, blurred_image, binary_image
+        image, cropped_image, gray_image, blurred_image, binary_image
     )
 
     # Print summary
-    _print_preprocessing_summary(original_image, cropped_image, crop_info)
+    _print_preprocessing_summary(image, cropped_image, crop_info, kernel_size, threshold_value)
 
     return visualization, binary_image, crop_info
 
@@ -80,6 +113,7 @@ def apply_margin_crop(image, margin_ratio):
         'margin_ratio': margin_ratio,
         'original_size': image.shape,
         'cropped_size': cropped.shape,
+        'cropped_color': cropped,
         'margins': (margin_x, margin_y, margin_x, margin_y),
         'pixels_removed': {
             'left': margin_x,
@@ -101,38 +135,92 @@ def convert_to_grayscale(image):
         image (numpy.ndarray): Input image
 
     Returns:
-        numpy.ndarray: Grayscale image
+        numpy.ndarray: Grayscale image (the input itself if it is already grayscale)
     """
     if len(image.shape) == 3:
         return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    return image.copy()
+    # Blur and visualization only read the grayscale image, so no copy is needed
+    return image
 
 
-def apply_gaussian_blur(image):
+def apply_gaussian_blur(image, kernel_size):
     """
     Apply Gaussian blur to reduce noise.
 
     Args:
         image (numpy.ndarray): Input grayscale image
+        kernel_size (tuple): Gaussian kernel size (width, height)
 
     Returns:
         numpy.ndarray: Blurred image
     """
-    return cv2.GaussianBlur(image, config.GAUSSIAN_BLUR_KERNEL, 0)
+    return cv2.GaussianBlur(image, kernel_size, 0)
 
 
-def apply_threshold(image):
+def apply_threshold(image, threshold_value):
     """
     Apply inverted binary threshold (black markers become white).
 
     Args:
         image (numpy.ndarray): Input grayscale image
+        threshold_value (int): Pixels above this value become 0, others 255
 
     Returns:
         numpy.ndarray: Binary thresholded image
     """
-    _, thresh = cv2.threshold(image, config.THRESHOLD_VALUE, 255, cv2.THRESH_BINARY_INV)
-    return thresh
+    return cv2.LUT(image, _threshold_lut(threshold_value))
+
+
+def fused_preprocess(bgr, margin_x, margin_y, thresh, kernel_size=(5, 5), use_opencl=False):
+    """
+    Margin crop, grayscale, 5x5 Gaussian blur and inverted threshold in one pass.
+
+    Uses a Numba kernel that reads each input pixel once when Numba is installed
+    and the configured blur kernel is 5x5; otherwise falls back to OpenCV.
+    The result is bit-identical to the OpenCV path.
+
+    Args:
+        bgr (numpy.ndarray): Input BGR image
+        margin_x (int): Pixels to drop from the left and right edges
+        margin_y (int): Pixels to drop from the top and bottom edges
+        thresh (int): Threshold value (pixels above become 0, others 255)
+        kernel_size (tuple): Gaussian kernel size (width, height)
+        use_opencl (bool): Run the OpenCV fallback through cv2.UMat when available
+
+    Returns:
+        numpy.ndarray: Binary thresholded image of the cropped region
+    """
+    height, width = bgr.shape[:2]
+    cropped = bgr[margin_y:height-margin_y, margin_x:width-margin_x]
+
+    if (NUMBA_AVAILABLE and cropped.ndim == 3 and cropped.dtype == np.uint8
+            and tuple(kernel_size) == (5, 5)
+            and min(cropped.shape[:2]) >= 3):
+        return _fused_preprocess_kernel(bgr, margin_x, margin_y, thresh)
+
+    gray = cv2.cvtColor(cropped, cv2.COLOR_BGR2GRAY) if cropped.ndim == 3 else cropped
+    blurred = cv2.GaussianBlur(_to_device(gray, use_opencl), kernel_size, 0)
+    return _to_host(apply_threshold(blurred, thresh))
+
+
+def downsample_binary(binary_image, levels):
+    """
+    Build a coarser binary image for corner detection with an integer pyramid.
+
+    Each level halves the resolution with cv2.pyrDown and re-thresholds the
+    smoothed result at 127 so the output stays strictly binary.
+
+    Args:
+        binary_image (numpy.ndarray): Binary thresholded image
+        levels (int): Number of pyramid levels (0 returns the input unchanged)
+
+    Returns:
+        numpy.ndarray: Binary image at 1 / 2**levels resolution
+    """
+    for _ in range(levels):
+        downsampled = cv2.pyrDown(binary_image)
+        _, binary_image = cv2.threshold(downsampled, 127, 255, cv2.THRESH_BINARY)
+    return binary_image
 
 
 # =============================================================================
@@ -154,18 +242,15 @@ def create_preprocessing_visualization(original, cropped, gray, blurred, binary)
         numpy.ndarray: Combined visualization
     """
     vis_height = config.VISUALIZATION_HEIGHT
+    panels = [original, cropped, gray, blurred, binary]
+    widths = [_width_at_height(panel, vis_height) for panel in panels]
 
-    # Resize all images to same height
-    images = [
-        _resize_to_height(original, vis_height),
-        _resize_to_height(cropped, vis_height),
-        _resize_to_height(_to_bgr(gray), vis_height),
-        _resize_to_height(_to_bgr(blurred), vis_height),
-        _resize_to_height(_to_bgr(binary), vis_height)
-    ]
-
-    # Combine horizontally
-    combined = np.hstack(images)
+    # Resize every panel straight into its tile of one preallocated canvas
+    combined = np.empty((vis_height, sum(widths), 3), dtype=np.uint8)
+    x_pos = 0
+    for panel, width in zip(panels, widths):
+        _resize_into(panel, combined[:, x_pos:x_pos + width])
+        x_pos += width
 
     # Add labels
     return _add_visualization_labels(combined,
@@ -182,51 +267,130 @@ def _create_no_crop_info(image, margin_ratio):
         'applied': False,
         'margin_ratio': margin_ratio,
         'original_size': image.shape,
+        'cropped_color': image,
         'margins': (0, 0, 0, 0)
     }
 
 
-def _print_preprocessing_summary(original, cropped, crop_info):
+def _print_preprocessing_summary(original, cropped, crop_info, kernel_size, threshold_value):
     """Print preprocessing summary."""
-    print(f"   ✓ Applied permanent margin crop: {original.shape} -> {cropped.shape}")
+    log.info("   ✓ Applied permanent margin crop: %s -> %s", original.shape, cropped.shape)
     if crop_info['applied']:
-        print(f"   ✓ Removed {crop_info['pixels_removed']['total']} pixels from margins")
-    print(f"   ✓ Converted to grayscale: {cropped.shape[:2]}")
-    print(f"   ✓ Applied Gaussian blur with kernel: {config.GAUSSIAN_BLUR_KERNEL}")
-    print(f"   ✓ Applied inverted threshold at value: {config.THRESHOLD_VALUE}")
+        log.info("   ✓ Removed %s pixels from margins", crop_info['pixels_removed']['total'])
+    log.info("   ✓ Converted to grayscale: %s", cropped.shape[:2])
+    log.info("   ✓ Applied Gaussian blur with kernel: %s", kernel_size)
+    log.info("   ✓ Applied inverted threshold at value: %s", threshold_value)
+
 
+@lru_cache(maxsize=8)
+def _threshold_lut(threshold_value):
+    """256-entry table equivalent to THRESH_BINARY_INV at threshold_value (values > threshold become 0)."""
+    return np.where(np.arange(256) > threshold_value, 0, 255).astype(np.uint8)
 
-def _resize_to_height(image, target_height):
-    """Resize image to specific height maintaining aspect ratio."""
+
+def _to_device(image, use_opencl):
+    """Wrap image in a cv2.UMat so OpenCV runs it through OpenCL, when enabled and available."""
+    if use_opencl and cv2.ocl.haveOpenCL():
+        return cv2.UMat(image)
+    return image
+
+
+def _to_host(image):
+    """Download a cv2.UMat result back to a numpy array (numpy arrays pass through)."""
+    if isinstance(image, cv2.UMat):
+        return image.get()
+    return image
+
+
+def _width_at_height(image, target_height):
+    """Width of image when resized to target_height maintaining aspect ratio."""
     h, w = image.shape[:2]
     aspect_ratio = w / h
-    target_width = int(target_height * aspect_ratio)
-    return cv2.resize(image, (target_width, target_height))
+    return int(target_height * aspect_ratio)
 
 
-def _to_bgr(image):
-    """Convert grayscale image to BGR for visualization."""
+def _resize_into(image, tile):
+    """Resize image into a BGR canvas tile in place (grayscale is expanded after resizing)."""
+    size = (tile.shape[1], tile.shape[0])
     if len(image.shape) == 2:
-        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
-    return image
+        cv2.cvtColor(cv2.resize(image, size), cv2.COLOR_GRAY2BGR, dst=tile)
+    else:
+        cv2.resize(image, size, dst=tile)
+
+
+@njit(cache=True)
+def _reflect_101(index, size):
+    """Mirror an out-of-range index like cv2.BORDER_REFLECT_101."""
+    if index < 0:
+        return -index
+    if index >= size:
+        return 2 * size - 2 - index
+    return index
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _fused_preprocess_kernel(bgr, margin_x, margin_y, thresh):
+    """Numba kernel behind fused_preprocess; integer math with [1,4,6,4,1] weights."""
+    height = bgr.shape[0] - 2 * margin_y
+    width = bgr.shape[1] - 2 * margin_x
+    weights = (1, 4, 6, 4, 1)
+
+    # Pass 1: luma + horizontal Gaussian (sums fit in uint16: 255 * 16)
+    horizontal = np.empty((height, width), dtype=np.uint16)
+    for y in prange(height):
+        row = bgr[margin_y + y, margin_x:margin_x + width]
+        gray = np.empty(width, dtype=np.int32)
+        for x in range(width):
+            gray[x] = (row[x, 0] * _GRAY_B + row[x, 1] * _GRAY_G + row[x, 2] * _GRAY_R
+                       + (1 << (_GRAY_SHIFT - 1))) >> _GRAY_SHIFT
+        for x in range(width):
+            acc = 0
+            for k in range(5):
+                acc += weights[k] * gray[_reflect_101(x + k - 2, width)]
+            horizontal[y, x] = acc
+
+    # Pass 2: vertical Gaussian, round (sum / 256) and inverted threshold in one store
+    binary = np.empty((height, width), dtype=np.uint8)
+    for y in prange(height):
+        for x in range(width):
+            acc = 0
+            for k in range(5):
+                acc += weights[k] * horizontal[_reflect_101(y + k - 2, height), x]
+            binary[y, x] = 0 if ((acc + 128) >> 8) > thresh else 255
+
+    return binary
 
 
 def _add_visualization_labels(combined_image, labels):
     """Add text labels to combined visualization."""
-    label_height = 30
-    total_height = combined_image.shape[0] + label_height
+    label_height = _LABEL_HEIGHT
     total_width = combined_image.shape[1]
 
-    # Create labeled image
-    labeled = np.zeros((total_height, total_width, 3), dtype=np.uint8)
-    labeled[label_height:, :] = combined_image
+    # Create labeled image with a black label strip on top (single alloc + copy)
+    labeled = cv2.copyMakeBorder(combined_image, label_height, 0, 0, 0,
+                                 cv2.BORDER_CONSTANT, value=(0, 0, 0))
 
-    # Add labels
-    font = cv2.FONT_HERSHEY_SIMPLEX
+    # Stamp pre-rendered labels (white on black, so max() merges any overlap)
     img_width = total_width // len(labels)
 
     for i, label in enumerate(labels):
         x_pos = i * img_width + img_width // 2 - len(label) * 4
-        cv2.putText(labeled, label, (x_pos, 20), font, 0.6, (255, 255, 255), 2)
+        strip = _label_strip(label)
+        left = x_pos - _LABEL_PADDING
+        src_start = max(0, -left)
+        src_end = min(strip.shape[1], total_width - left)
+        if src_start < src_end:
+            region = labeled[:label_height, left + src_start:left + src_end]
+            cv2.max(region, strip[:, src_start:src_end], dst=region)
 
     return labeled
+
+
+@lru_cache(maxsize=None)
+def _label_strip(label):
+    """Render a label once into a black strip; the text origin sits _LABEL_PADDING px from the left."""
+    (text_width, _), _ = cv2.getTextSize(label, _LABEL_FONT, _LABEL_SCALE, _LABEL_THICKNESS)
+    strip = np.zeros((_LABEL_HEIGHT, text_width + 2 * _LABEL_PADDING, 3), dtype=np.uint8)
+    cv2.putText(strip, label, (_LABEL_PADDING, _LABEL_BASELINE), _LABEL_FONT,
+                _LABEL_SCALE, (255, 255, 255), _LABEL_THICKNESS)
+    return strip
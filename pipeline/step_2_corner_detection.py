@@ -4,12 +4,97 @@ Grid-based analysis to detect corner marker locations.
 """
 
 import cv2
+import logging
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 import config
+from pipeline._io import save_step_image, write_jpeg
+from pipeline._jit import NUMBA_AVAILABLE, njit
+
+log = logging.getLogger(__name__)
+
+# The four corner regions are disjoint, so they are scanned concurrently. The
+# per-corner work runs in the GIL-free Numba kernel (or NumPy without Numba).
+# Executor threads do not survive fork(), so each process creates its own pool.
+_corner_pool = None
+_corner_pool_pid = None
+
+# Corner names in corner-region order; CornerCells.corner indexes into this
+CORNER_NAMES = ('TL', 'TR', 'BL', 'BR')
+
+# Missing corner -> (a, b, c) such that missing = a + b - c
+MISSING_RULE = {
+    'TL': ('TR', 'BL', 'BR'),
+    'TR': ('TL', 'BR', 'BL'),
+    'BL': ('TL', 'BR', 'TR'),
+    'BR': ('TR', 'BL', 'TL'),
+}
+
+# Early-exit best cell search: cell columns per strip, and slack for float rounding
+_SCAN_STRIP_COLUMNS = 8
+_SCORE_BOUND_MARGIN = 1e-9
+
+
+@dataclass
+class CornerCells:
+    """Corner cells as parallel arrays (one row per cell)."""
+    centers: np.ndarray        # (N, 2) int32 cell centers (x, y)
+    pcts: np.ndarray           # (N,) float64 white percentages
+    corner: np.ndarray         # (N,) uint8 index into CORNER_NAMES
+    is_calculated: np.ndarray  # (N,) bool, True for geometrically calculated corners
+
+    @classmethod
+    def empty(cls):
+        """Return a CornerCells with no cells."""
+        return cls(np.empty((0, 2), np.int32), np.empty(0), np.empty(0, np.uint8), np.empty(0, bool))
+
+    def __len__(self):
+        return len(self.pcts)
+
+    def append(self, center, corner_name, pct, is_calculated=False):
+        """Return a new CornerCells with one extra cell."""
+        return CornerCells(
+            np.vstack([self.centers, np.array([center], dtype=np.int32)]),
+            np.append(self.pcts, pct),
+            np.append(self.corner, np.uint8(CORNER_NAMES.index(corner_name))),
+            np.append(self.is_calculated, is_calculated),
+        )
+
+    def to_dicts(self):
+        """Convert to the list-of-dicts form returned by find_markers."""
+        cells = []
+        for (x, y), pct, corner, calculated in zip(self.centers.tolist(), self.pcts.tolist(),
+                                                   self.corner.tolist(), self.is_calculated.tolist()):
+            cell = {'center': (x, y), 'white_percentage': pct, 'corner': CORNER_NAMES[corner]}
+            if calculated:
+                cell['is_calculated'] = True
+            cells.append(cell)
+        return cells
+
+
+def build_white_mask(binary_image):
+    """
+    Build the white-pixel mask step 2 counts cells on.
+
+    Build it once per binary image and pass it to every find_markers call on
+    that image (e.g. the recalculation pass) to skip the repeated comparison.
 
+    Args:
+        binary_image: Binary image with white pixels at 255
 
-def find_markers(binary_image, original_image, base_name="1"):
+    Returns:
+        numpy.ndarray: uint8 mask in {0, 1}, or None when the Numba kernel
+            counts white pixels on binary_image directly
+    """
+    if NUMBA_AVAILABLE:
+        return None
+    return (binary_image == 255).view(np.uint8)
+
+
+def find_markers(binary_image, original_image, base_name="1", white_mask=None, missing_corner=None,
+                 save_image=None):
     """
     Detect corner markers using grid-based analysis.
 
@@ -17,44 +102,72 @@ def find_markers(binary_image, original_image, base_name="1"):
         binary_image: Input binary image
         original_image: Original color image for visualization
         base_name: Base name for output files
+        white_mask: Optional mask from build_white_mask(binary_image); built here if omitted
+        missing_corner: Corner label to treat as missing (defaults to config.FORCE_MISSING_CORNER)
+        save_image: Optional callable(image, filename, write_func) that queues step images
+            on the running pipeline's writer; without one they are written immediately
 
     Returns:
-        tuple: (visualization_image, synthetic_contours)
+        tuple: (visualization_image or None, synthetic_contours, final_cells). Visualizations
+            are only built in debug mode, as layers on one new canvas saved after each layer.
+            final_cells holds one dict per contour with its 'center' (the centroid of the
+            edge-clamped contour, which can differ from the cell center at the image border)
+            and 'corner' label.
     """
     height, width = binary_image.shape
+    save_steps = config.DEBUG_MODE
+    if missing_corner is None:
+        missing_corner = config.FORCE_MISSING_CORNER
 
     # Define corner regions
     corner_regions = _define_corner_regions(width, height)
     cell_size = max(1, int(width * config.CELL_SIZE_RATIO))
 
-    print(f"   📐 Corner grid: {corner_regions['TL'][2]}x{corner_regions['TL'][3]} regions")
+    # Without Numba, cell counts come from a summed-area table of white pixels
+    white_integral = None
+    if not NUMBA_AVAILABLE:
+        if white_mask is None:
+            white_mask = build_white_mask(binary_image)
+        white_integral = cv2.integral(white_mask)
 
-    # Create grid visualization
-    grid_vis = _create_grid_visualization(binary_image, corner_regions, cell_size)
-    _save_step_image(grid_vis, f"{base_name}_step_2a_grid.jpg")
+    log.info("   📐 Corner grid: %sx%s regions", corner_regions['TL'][2], corner_regions['TL'][3])
 
-    # Detect white cells in each corner
-    corner_results = _analyze_corners(binary_image, corner_regions, cell_size)
+    # Create grid visualization (the canvas all step 2 layers are drawn on)
+    vis_image = None
+    if save_steps:
+        vis_image = _create_grid_visualization(binary_image, corner_regions, cell_size)
+        _save_step_image(vis_image, f"{base_name}_step_2a_grid.jpg", save_image)
 
-    # Create white cell visualization
-    white_vis = _create_white_cell_visualization(grid_vis, corner_results)
-    _save_step_image(white_vis, f"{base_name}_step_2b_white_cells.jpg")
+    if save_steps:
+        # Detect all white cells in each corner (needed for the white cell layer)
+        white_cells = _analyze_corners(binary_image, white_integral, corner_regions, cell_size,
+                                       missing_corner)
 
-    # Select best cells
-    best_cells = _select_best_cells(corner_results, corner_regions, width, height)
+        # Add white cell layer
+        _draw_white_cells(vis_image, white_cells)
+        _save_step_image(vis_image, f"{base_name}_step_2b_white_cells.jpg", save_image)
 
-    # Create best cell visualization
-    best_vis = _create_best_cell_visualization(grid_vis, best_cells)
-    _save_step_image(best_vis, f"{base_name}_step_2d_best_cells.jpg")
+        # Select best cells
+        best_cells = _select_best_cells(white_cells, corner_regions, width, height, missing_corner)
+    else:
+        # Scan from the outer edge and stop once no remaining cell can win
+        best_cells = _find_best_cells(binary_image, white_integral, corner_regions, cell_size,
+                                      width, height, missing_corner)
+
+    # Add best cell layer
+    if save_steps:
+        _draw_best_cells(vis_image, best_cells)
+        _save_step_image(vis_image, f"{base_name}_step_2d_best_cells.jpg", save_image)
 
     # Handle missing corners
-    final_cells = _handle_missing_corners(best_cells, width, height, base_name, grid_vis)
+    final_cells = _handle_missing_corners(best_cells, width, height, base_name, vis_image,
+                                          missing_corner, save_image)
 
-    # Create synthetic contours
-    contours = _create_synthetic_contours(final_cells, binary_image.shape)
+    # Create synthetic contours; later steps use their centroids as the corner points
+    contours, contour_centroids = _create_synthetic_contours(final_cells, binary_image.shape)
 
-    print(f"   ✅ Found {len(final_cells)} corners")
-    return white_vis, contours
+    log.info("   ✅ Found %s corners", len(final_cells))
+    return vis_image, contours, replace(final_cells, centers=contour_centroids).to_dicts()
 
 
 def _define_corner_regions(width, height):
@@ -102,16 +215,19 @@ def _create_grid_visualization(binary_image, corner_regions, cell_size):
 def _draw_dashed_lines(image, x1, y1, x2, y2, color, thickness, dash_length):
     """Draw dashed rectangle."""
     # Top and bottom lines
-    for i in range(x1, x2, dash_length * 2):
-        end_x = min(i + dash_length, x2)
-        cv2.line(image, (i, y1), (end_x, y1), color, thickness)
-        cv2.line(image, (i, y2 - 1), (end_x, y2 - 1), color, thickness)
-
+    starts_x = np.arange(x1, x2, dash_length * 2)
+    ends_x = np.minimum(starts_x + dash_length, x2)
     # Left and right lines
-    for i in range(y1, y2, dash_length * 2):
-        end_y = min(i + dash_length, y2)
-        cv2.line(image, (x1, i), (x1, end_y), color, thickness)
-        cv2.line(image, (x2 - 1, i), (x2 - 1, end_y), color, thickness)
+    starts_y = np.arange(y1, y2, dash_length * 2)
+    ends_y = np.minimum(starts_y + dash_length, y2)
+
+    segments = np.concatenate([
+        _segments(starts_x, y1, ends_x, y1),
+        _segments(starts_x, y2 - 1, ends_x, y2 - 1),
+        _segments(x1, starts_y, x1, ends_y),
+        _segments(x2 - 1, starts_y, x2 - 1, ends_y),
+    ])
+    cv2.polylines(image, segments, False, color, thickness)
 
 
 def _draw_cell_grid(image, x1, y1, x2, y2, cell_size):
@@ -120,239 +236,354 @@ def _draw_cell_grid(image, x1, y1, x2, y2, cell_size):
     height, width = image.shape[:2]
     thickness = max(1, int(width * config.CELL_GRID_THICKNESS_RATIO))
 
-    # Vertical lines
-    for cell_x in range(x1, x2, cell_size):
-        cv2.line(image, (cell_x, y1), (cell_x, y2), cell_color, thickness)
-
-    # Horizontal lines
-    for cell_y in range(y1, y2, cell_size):
-        cv2.line(image, (x1, cell_y), (x2, cell_y), cell_color, thickness)
-
-
-def _analyze_corners(binary_image, corner_regions, cell_size):
-    """Analyze corners to find white cells."""
-    corner_results = {}
+    # Vertical and horizontal lines
+    cell_xs = np.arange(x1, x2, cell_size)
+    cell_ys = np.arange(y1, y2, cell_size)
+    segments = np.concatenate([
+        _segments(cell_xs, y1, cell_xs, y2),
+        _segments(x1, cell_ys, x2, cell_ys),
+    ])
+    cv2.polylines(image, segments, False, cell_color, thickness)
+
+
+def _segments(start_x, start_y, end_x, end_y):
+    """Stack line endpoints (scalars or equal-length arrays) into an (N, 2, 2) int32 array for cv2.polylines."""
+    start_x, start_y, end_x, end_y = np.broadcast_arrays(start_x, start_y, end_x, end_y)
+    return np.stack([start_x, start_y, end_x, end_y], axis=-1).reshape(-1, 2, 2).astype(np.int32)
+
+
+def _get_corner_pool():
+    """Return this process's corner scan pool, creating it on first use (and again after a fork)."""
+    global _corner_pool, _corner_pool_pid
+    if _corner_pool is None or _corner_pool_pid != os.getpid():
+        _corner_pool = ThreadPoolExecutor(max_workers=4)
+        _corner_pool_pid = os.getpid()
+    return _corner_pool
+
+
+def _analyze_corners(binary_image, white_integral, corner_regions, cell_size, missing_corner=None):
+    """Analyze corners to find white cells, returned as CornerCells in corner-region order."""
+    centers, pcts, corners = [], [], []
+
+    corner_names = [name for name in corner_regions if name != missing_corner]
+    results = _get_corner_pool().map(
+        lambda name: _corner_white_cells(binary_image, white_integral, corner_regions[name],
+                                         cell_size, config.WHITE_CELL_THRESHOLD),
+        corner_names)
+
+    for corner_name, (corner_centers, corner_pcts) in zip(corner_names, results):
+        centers.append(corner_centers)
+        pcts.append(corner_pcts)
+        corners.append(np.full(len(corner_pcts), CORNER_NAMES.index(corner_name), dtype=np.uint8))
+
+    if not pcts:
+        return CornerCells.empty()
+    return CornerCells(
+        np.concatenate(centers).astype(np.int32),
+        np.concatenate(pcts),
+        np.concatenate(corners),
+        np.zeros(sum(len(p) for p in pcts), dtype=bool),
+    )
+
+
+def _corner_white_cells(binary_image, white_integral, region, cell_size, threshold):
+    """White cells of one corner region as (centers (N, 2), white percentages (N,))."""
+    x, y, w, h = region
+    white_percentages, row_starts, col_starts = _white_cell_grid(
+        binary_image, white_integral, x, y, w, h, cell_size)
+
+    rows, cols = np.nonzero(white_percentages > threshold)
+    centers = np.column_stack([x + col_starts[cols] + cell_size//2,
+                               y + row_starts[rows] + cell_size//2])
+    return centers, white_percentages[rows, cols]
+
+
+def _white_cell_grid(binary_image, white_integral, x, y, w, h, cell_size):
+    """
+    White percentage of every cell of an ROI (cells at the right/bottom edge may be partial).
 
-    for corner_name, (x, y, w, h) in corner_regions.items():
-        if config.FORCE_MISSING_CORNER and corner_name == config.FORCE_MISSING_CORNER:
-            corner_results[corner_name] = []
-            continue
+    Args:
+        binary_image: Binary image
+        white_integral: Summed-area table of white pixels, or None to count with the Numba kernel
+        x, y, w, h: ROI in image coordinates
+        cell_size: Cell edge length in pixels
 
-        corner_roi = binary_image[y:y+h, x:x+w]
-        white_cells = []
+    Returns:
+        tuple: (white_percentages (rows, cols), row_starts, col_starts) with starts relative to the ROI
+    """
+    row_starts = np.arange(0, h, cell_size)
+    col_starts = np.arange(0, w, cell_size)
+    y1 = (y + row_starts)[:, None]
+    x1 = (x + col_starts)[None, :]
+    y2 = (y + np.minimum(row_starts + cell_size, h))[:, None]
+    x2 = (x + np.minimum(col_starts + cell_size, w))[None, :]
+    if white_integral is None:
+        counts = _count_white_cells(binary_image, x, y, w, h, cell_size)
+    else:
+        counts = (white_integral[y2, x2] - white_integral[y1, x2]
+                  - white_integral[y2, x1] + white_integral[y1, x1])
 
-        for cell_y in range(0, h, cell_size):
-            for cell_x in range(0, w, cell_size):
-                cell_roi = corner_roi[cell_y:cell_y+cell_size, cell_x:cell_x+cell_size]
+    return counts / ((y2 - y1) * (x2 - x1)) * 100, row_starts, col_starts
 
-                if cell_roi.size > 0:
-                    white_percentage = (np.sum(cell_roi == 255) / cell_roi.size) * 100
 
-                    if white_percentage > config.WHITE_CELL_THRESHOLD:
-                        white_cells.append({
-                            'center': (x + cell_x + cell_size//2, y + cell_y + cell_size//2),
-                            'white_percentage': white_percentage,
-                            'corner': corner_name
-                        })
+@njit(nogil=True, cache=True)
+def _count_white_cells(binary_image, x, y, w, h, cell_size):
+    """Numba kernel: white-pixel count per cell of one corner ROI (releases the GIL)."""
+    n_rows = (h + cell_size - 1) // cell_size
+    n_cols = (w + cell_size - 1) // cell_size
+    counts = np.zeros((n_rows, n_cols), dtype=np.int64)
 
-        corner_results[corner_name] = white_cells
+    for row in range(n_rows):
+        row_end = min((row + 1) * cell_size, h)
+        for cell_y in range(row * cell_size, row_end):
+            for cell_x in range(w):
+                if binary_image[y + cell_y, x + cell_x] == 255:
+                    counts[row, cell_x // cell_size] += 1
 
-    return corner_results
+    return counts
 
 
-def _create_white_cell_visualization(base_image, corner_results):
-    """Add green markers for white cells."""
-    vis_image = base_image.copy()
+def _draw_white_cells(vis_image, white_cells):
+    """Add green markers for white cells (in place)."""
     green_color = (0, 255, 0)
     height, width = vis_image.shape[:2]
     cell_size = max(2, int(width * config.WHITE_CELL_MARKER_SIZE_RATIO))
     thickness = max(1, int(width * config.WHITE_CELL_BORDER_THICKNESS_RATIO))
 
-    for corner_cells in corner_results.values():
-        for cell in corner_cells:
-            center_x, center_y = cell['center']
-            top_left = (center_x - cell_size//2, center_y - cell_size//2)
-            bottom_right = (center_x + cell_size//2, center_y + cell_size//2)
-            cv2.rectangle(vis_image, top_left, bottom_right, green_color, thickness)
-
-    return vis_image
+    for center_x, center_y in white_cells.centers.tolist():
+        top_left = (center_x - cell_size//2, center_y - cell_size//2)
+        bottom_right = (center_x + cell_size//2, center_y + cell_size//2)
+        cv2.rectangle(vis_image, top_left, bottom_right, green_color, thickness)
 
 
-def _select_best_cells(corner_results, corner_regions, width, height):
+def _select_best_cells(white_cells, corner_regions, width, height, missing_corner=None):
     """Select best cell from each corner based on weighted scoring: 70% edge proximity + 30% corner proximity."""
-    best_cells = []
-
-    # Define actual corner positions for distance calculation
-    corner_positions = {
-        'TL': (0, 0),
-        'TR': (width - 1, 0),
-        'BL': (0, height - 1),
-        'BR': (width - 1, height - 1)
-    }
+    best = []
 
-    for corner_name, cells in corner_results.items():
-        if not cells or (config.FORCE_MISSING_CORNER and corner_name == config.FORCE_MISSING_CORNER):
+    for corner_index, corner_name in enumerate(CORNER_NAMES):
+        if corner_name == missing_corner:
             continue
+        indices = np.flatnonzero(white_cells.corner == corner_index)
+        if not len(indices):
+            continue
+
+        # Score all cells of the corner at once
+        total_score = _cell_scores(corner_name, white_cells.centers[indices, 0],
+                                   white_cells.centers[indices, 1], width, height)
+
+        # Select cell with highest score (first one on ties)
+        best.append(indices[np.argmax(total_score)])
 
-        # Calculate scores for each cell
-        scored_cells = []
-        corner_pos = corner_positions[corner_name]
+    return CornerCells(white_cells.centers[best], white_cells.pcts[best],
+                       white_cells.corner[best], white_cells.is_calculated[best])
 
-        for cell in cells:
-            x, y = cell['center']
 
-            # Edge proximity score (70% weight)
-            if corner_name in ['TL', 'BL']:
-                edge_score = 1.0 - (x / width)  # Closer to left edge = higher score
-            else:  # TR, BR
-                edge_score = x / width  # Closer to right edge = higher score
+def _corner_position(corner_name, width, height):
+    """Actual image corner used for distance scoring."""
+    return (0 if corner_name in ('TL', 'BL') else width - 1,
+            0 if corner_name in ('TL', 'TR') else height - 1)
 
-            # Corner proximity score (30% weight)
-            corner_distance = ((x - corner_pos[0])**2 + (y - corner_pos[1])**2)**0.5
-            max_distance = (width**2 + height**2)**0.5
-            corner_score = 1.0 - (corner_distance / max_distance)
 
-            # Combined weighted score
-            total_score = (0.7 * edge_score) + (0.3 * corner_score)
+def _cell_scores(corner_name, x, y, width, height):
+    """Weighted score of cells centered at (x, y): 70% edge proximity + 30% corner proximity."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    corner_pos = _corner_position(corner_name, width, height)
+    max_distance = (width**2 + height**2)**0.5
 
-            scored_cells.append((total_score, cell))
+    # Edge proximity score (70% weight)
+    if corner_name in ['TL', 'BL']:
+        edge_score = 1.0 - (x / width)  # Closer to left edge = higher score
+    else:  # TR, BR
+        edge_score = x / width  # Closer to right edge = higher score
 
-        # Select cell with highest score
-        best_cell = max(scored_cells, key=lambda x: x[0])[1]
-        best_cells.append(best_cell)
+    # Corner proximity score (30% weight)
+    corner_distance = np.sqrt((x - corner_pos[0])**2 + (y - corner_pos[1])**2)
+    corner_score = 1.0 - (corner_distance / max_distance)
 
-    return best_cells
+    # Combined weighted score
+    return (0.7 * edge_score) + (0.3 * corner_score)
 
 
-def _create_best_cell_visualization(base_image, best_cells):
-    """Highlight best cells with red circles."""
-    vis_image = base_image.copy()
+def _score_bound(corner_name, x, width, height):
+    """Upper bound of _cell_scores for any cell at least as far from the corner's edge as column center x."""
+    corner_x = _corner_position(corner_name, width, height)[0]
+    max_distance = (width**2 + height**2)**0.5
+    if corner_name in ('TL', 'BL'):
+        edge_score, dx = 1.0 - (x / width), max(0, x - corner_x)
+    else:
+        edge_score, dx = x / width, max(0, corner_x - x)
+    # The corner distance is at least the horizontal offset
+    return (0.7 * edge_score) + (0.3 * (1.0 - dx / max_distance))
+
+
+def _find_best_cells(binary_image, white_integral, corner_regions, cell_size, width, height,
+                     missing_corner=None):
+    """
+    Select the best cell per corner without scanning whole corner regions.
+
+    Cell columns are scanned in strips from the corner's outer edge inwards and
+    the scan stops once the score bound of the next column is below the best
+    cell found so far. Returns the same cells as
+    _select_best_cells(_analyze_corners(...)), including its tie-breaking.
+    """
+    corner_indices = [i for i, name in enumerate(CORNER_NAMES) if name != missing_corner]
+    results = _get_corner_pool().map(
+        lambda i: _best_cell_in_corner(binary_image, white_integral, CORNER_NAMES[i],
+                                       corner_regions[CORNER_NAMES[i]], cell_size, width, height,
+                                       config.WHITE_CELL_THRESHOLD),
+        corner_indices)
+
+    centers, pcts, corners = [], [], []
+    for corner_index, best in zip(corner_indices, results):
+        if best is not None:
+            centers.append(best[0])
+            pcts.append(best[1])
+            corners.append(corner_index)
+
+    if not pcts:
+        return CornerCells.empty()
+    return CornerCells(np.array(centers, dtype=np.int32), np.array(pcts, dtype=np.float64),
+                       np.array(corners, dtype=np.uint8), np.zeros(len(pcts), dtype=bool))
+
+
+def _best_cell_in_corner(binary_image, white_integral, corner_name, region, cell_size, width, height,
+                         threshold):
+    """Best white cell of one corner region as (center, white percentage), or None."""
+    x, y, w, h = region
+    n_cols = -(-w // cell_size)
+    from_left = corner_name in ('TL', 'BL')
+    best = None  # (score, row, column, center, pct)
+
+    scanned = 0
+    while scanned < n_cols:
+        strip = min(_SCAN_STRIP_COLUMNS, n_cols - scanned)
+        first_col = scanned if from_left else n_cols - scanned - strip
+        strip_x = x + first_col * cell_size
+        strip_w = min((first_col + strip) * cell_size, w) - first_col * cell_size
+
+        white_percentages, row_starts, col_starts = _white_cell_grid(
+            binary_image, white_integral, strip_x, y, strip_w, h, cell_size)
+        rows, cols = np.nonzero(white_percentages > threshold)
+
+        if len(rows):
+            center_x = strip_x + col_starts[cols] + cell_size//2
+            center_y = y + row_starts[rows] + cell_size//2
+            scores = _cell_scores(corner_name, center_x, center_y, width, height)
+            # Highest score; ties go to the first cell in row-major order like np.argmax
+            top = np.flatnonzero(scores == scores.max())
+            i = top[np.lexsort((cols[top], rows[top]))[0]]
+            candidate = (scores[i], rows[i], first_col + cols[i],
+                         (int(center_x[i]), int(center_y[i])), white_percentages[rows[i], cols[i]])
+            if (best is None or candidate[0] > best[0]
+                    or (candidate[0] == best[0] and candidate[1:3] < best[1:3])):
+                best = candidate
+
+        scanned += strip
+        if best is not None and scanned < n_cols:
+            next_col = scanned if from_left else n_cols - scanned - 1
+            next_x = x + next_col * cell_size + cell_size//2
+            if _score_bound(corner_name, next_x, width, height) + _SCORE_BOUND_MARGIN < best[0]:
+                break
+
+    return None if best is None else (best[3], best[4])
+
+
+def _draw_best_cells(vis_image, best_cells):
+    """Highlight best cells with red circles (in place)."""
     height, width = vis_image.shape[:2]
 
     red_color = config.COLOR_RED
     radius = max(1, int(width * config.BEST_CELL_CIRCLE_RADIUS_RATIO))
     thickness = max(1, int(width * config.BEST_CELL_CIRCLE_THICKNESS_RATIO))
 
-    for cell in best_cells:
-        center = cell['center']
+    for center in best_cells.centers.tolist():
+        center = tuple(center)
         cv2.circle(vis_image, center, radius, red_color, thickness)
         cv2.circle(vis_image, center, 2, red_color, -1)
 
-    return vis_image
-
 
-def _handle_missing_corners(best_cells, width, height, base_name, grid_vis):
+def _handle_missing_corners(best_cells, width, height, base_name, vis_image, missing_corner=None,
+                            save_image=None):
     """Handle missing corner calculation."""
-    final_cells = best_cells.copy()
+    final_cells = best_cells
 
     if len(best_cells) == 3:
         calculated = _calculate_missing_corner(best_cells, width, height)
         if calculated:
-            if config.FORCE_MISSING_CORNER:
-                calculated['corner'] = config.FORCE_MISSING_CORNER
-            final_cells.append(calculated)
+            center, corner_name = calculated
+            if missing_corner:
+                corner_name = missing_corner
+            final_cells = best_cells.append(center, corner_name, 100.0, is_calculated=True)
 
-            # Create calculated corner visualization
-            calc_vis = _create_calculated_corner_visualization(grid_vis, best_cells, calculated)
-            _save_step_image(calc_vis, f"{base_name}_step_2e_calculated_corner.jpg")
+            # Add calculated corner layer
+            if vis_image is not None:
+                _draw_calculated_corner(vis_image, center)
+                _save_step_image(vis_image, f"{base_name}_step_2e_calculated_corner.jpg", save_image)
 
     return final_cells
 
 
 def _calculate_missing_corner(detected_corners, width, height):
-    """Calculate missing 4th corner from 3 detected corners."""
+    """Calculate missing 4th corner from 3 detected corners, as ((x, y), corner_name)."""
     if len(detected_corners) != 3:
         return None
 
-    corners_by_name = {c['corner']: c['center'] for c in detected_corners}
+    corners_by_name = {CORNER_NAMES[corner]: tuple(center) for center, corner
+                       in zip(detected_corners.centers.tolist(), detected_corners.corner.tolist())}
     detected_names = set(corners_by_name.keys())
     missing_name = list({'TL', 'TR', 'BL', 'BR'} - detected_names)[0]
 
-    # Calculate using geometric relationships
-    if missing_name == 'TL':
-        tr, bl, br = corners_by_name['TR'], corners_by_name['BL'], corners_by_name['BR']
-        pos = (tr[0] + bl[0] - br[0], tr[1] + bl[1] - br[1])
-    elif missing_name == 'TR':
-        tl, br, bl = corners_by_name['TL'], corners_by_name['BR'], corners_by_name['BL']
-        pos = (tl[0] + br[0] - bl[0], tl[1] + br[1] - bl[1])
-    elif missing_name == 'BL':
-        tl, br, tr = corners_by_name['TL'], corners_by_name['BR'], corners_by_name['TR']
-        pos = (tl[0] + br[0] - tr[0], tl[1] + br[1] - tr[1])
-    else:  # BR
-        tl, tr, bl = corners_by_name['TL'], corners_by_name['TR'], corners_by_name['BL']
-        pos = (tr[0] + bl[0] - tl[0], tr[1] + bl[1] - tl[1])
+    # Parallelogram completion: missing = a + b - c
+    a, b, c = (corners_by_name[name] for name in MISSING_RULE[missing_name])
+    pos = (a[0] + b[0] - c[0], a[1] + b[1] - c[1])
 
     # Clamp to image bounds
     x = max(0, min(int(pos[0]), width - 1))
     y = max(0, min(int(pos[1]), height - 1))
 
-    return {
-        'center': (x, y),
-        'corner': missing_name,
-        'white_percentage': 100.0,
-        'is_calculated': True
-    }
+    return (x, y), missing_name
 
 
-def _create_calculated_corner_visualization(base_image, detected_corners, calculated_corner):
-    """Show detected corners (red) and calculated corner (blue)."""
-    vis_image = base_image.copy()
+def _draw_calculated_corner(vis_image, center):
+    """Mark the calculated corner in blue (in place, over the red detected-corner layer)."""
     height, width = vis_image.shape[:2]
 
     radius = max(1, int(width * config.BEST_CELL_CIRCLE_RADIUS_RATIO))
     thickness = max(1, int(width * config.BEST_CELL_CIRCLE_THICKNESS_RATIO))
 
-    # Draw detected corners in red
-    for corner in detected_corners:
-        center = corner['center']
-        cv2.circle(vis_image, center, radius, config.COLOR_RED, thickness)
-        cv2.circle(vis_image, center, 2, config.COLOR_RED, -1)
-
-    # Draw calculated corner in blue
-    if calculated_corner:
-        center = calculated_corner['center']
-        square_size = radius
-        top_left = (center[0] - square_size, center[1] - square_size)
-        bottom_right = (center[0] + square_size, center[1] + square_size)
-        cv2.rectangle(vis_image, top_left, bottom_right, config.COLOR_BLUE, thickness)
-        cv2.circle(vis_image, center, 2, config.COLOR_BLUE, -1)
-
-    return vis_image
+    square_size = radius
+    top_left = (center[0] - square_size, center[1] - square_size)
+    bottom_right = (center[0] + square_size, center[1] + square_size)
+    cv2.rectangle(vis_image, top_left, bottom_right, config.COLOR_BLUE, thickness)
+    cv2.circle(vis_image, center, 2, config.COLOR_BLUE, -1)
 
 
 def _create_synthetic_contours(cells, image_shape):
-    """Create synthetic contours from cell centers."""
-    contours = []
-
-    for cell in cells:
-        center_x, center_y = cell['center']
-        size = max(1, int(image_shape[1] * config.SYNTHETIC_MARKER_SIZE_RATIO))
+    """Create synthetic contours from cell centers, returned with each contour's integer centroid."""
+    size = max(1, int(image_shape[1] * config.SYNTHETIC_MARKER_SIZE_RATIO))
+    max_x, max_y = image_shape[1] - 1, image_shape[0] - 1
+    center_x, center_y = cells.centers[:, 0], cells.centers[:, 1]
 
-        points = np.array([
-            [center_x - size, center_y - size],
-            [center_x + size, center_y - size],
-            [center_x + size, center_y + size],
-            [center_x - size, center_y + size]
-        ], dtype=np.int32)
+    # Clamp the square's edges to image bounds once, then assemble the corners
+    left = np.clip(center_x - size, 0, max_x)
+    right = np.clip(center_x + size, 0, max_x)
+    top = np.clip(center_y - size, 0, max_y)
+    bottom = np.clip(center_y + size, 0, max_y)
 
-        # Clamp to image bounds
-        points[:, 0] = np.clip(points[:, 0], 0, image_shape[1] - 1)
-        points[:, 1] = np.clip(points[:, 1], 0, image_shape[0] - 1)
+    points = np.stack([left, top, right, top, right, bottom, left, bottom], axis=1)
+    centroids = np.column_stack([(left + right) // 2, (top + bottom) // 2])
+    return list(points.reshape(-1, 4, 1, 2)), centroids
 
-        contours.append(points.reshape(-1, 1, 2))
 
-    return contours
+def _save_step_image(image, filename, save_image=None):
+    """Save step image to configured directory with automatic overwrite."""
+    save_step_image(image, filename, _write_step_image, save_image)
 
 
-def _save_step_image(image, filename):
-    """Save step image to configured directory with automatic overwrite."""
-    steps_path = os.path.join(config.tmp_dir, config.steps_dir)
-    # Always create directory structure (handles existing directories gracefully)
-    os.makedirs(steps_path, exist_ok=True)
-    path = os.path.join(steps_path, filename)
-    # cv2.imwrite automatically overwrites existing files
-    success = cv2.imwrite(path, image)
-    if success:
-        print(f"   💾 Step 2: Saved {path}")
+def _write_step_image(path, image):
+    """Write a step image at the step JPEG quality (runs on the background writer)."""
+    if write_jpeg(path, image):
+        log.info("   💾 Step 2: Saved %s", path)
     else:
-        print(f"   ❌ Step 2: Failed to save {path}")
+        log.error("   ❌ Step 2: Failed to save %s", path)
@@ -4,12 +4,24 @@ Verify detected corners by drawing horizontal and vertical lines from adjacent c
 """
 
 import cv2
+import logging
 import numpy as np
-import os
 import config
+from pipeline._geom import classify_corners, contour_centers
+from pipeline._io import save_step_image, write_jpeg
 
+log = logging.getLogger(__name__)
 
-def verify_corners(contours, original_image, base_name="1"):
+# Adjacent corners for each position: (horizontal partner, vertical partner)
+CORNER_PARTNERS = {
+    "TL": ("TR", "BL"),
+    "TR": ("TL", "BR"),
+    "BR": ("BL", "TR"),
+    "BL": ("BR", "TL")
+}
+
+
+def verify_corners(contours, original_image, base_name="1", cells=None, save_image=None):
     """
     Verify corner markers by drawing lines from adjacent corners.
 
@@ -17,198 +29,201 @@ def verify_corners(contours, original_image, base_name="1"):
         contours: List of synthetic contours from Step 2
         original_image: Color image for visualization
         base_name: Base name for output files
+        cells: Optional Step 2 cells matching contours; their centers and corner
+            labels are used directly instead of being recovered from the contours
+        save_image: Optional callable(image, filename, write_func) that queues step images
+            on the running pipeline's writer; without one they are written immediately
 
     Returns:
-        tuple: (visualization_image, verified_contours, needs_recalculation)
+        tuple: (visualization_image or None, verified_contours, needs_recalculation,
+            missing_label, corner_points, corner_labels). The visualization is only built
+            in debug mode. missing_label is the corner to treat as missing when Step 2 is
+            rerun, or None when no recalculation is needed. corner_points and corner_labels
+            hold the center and label of each verified contour for Step 4, or are None when
+            verification was not possible.
     """
+    save_steps = config.DEBUG_MODE
+
     if len(contours) < 3:
-        print(f"   ⚠️  Warning: Only {len(contours)} contours found, need at least 3 for verification")
-        vis_image = original_image.copy()
-        _save_step_image(vis_image, f"{base_name}_step_3a_corner_verification.jpg")
-        return vis_image, contours, False
+        log.warning("   ⚠️  Warning: Only %s contours found, need at least 3 for verification", len(contours))
+        vis_image = _save_unverified_image(original_image, base_name, save_steps, save_image)
+        return vis_image, contours, False, None, None, None
 
-    # Extract corner points from contours
-    corners = _extract_corners_from_contours(contours)
+    # Extract corner points from contours (or take them straight from Step 2)
+    if cells is not None:
+        corners = [cell['center'] for cell in cells]
+    else:
+        corners = contour_centers(contours)
 
     if len(corners) < 3:
-        print(f"   ⚠️  Warning: Could only extract {len(corners)} corner points")
-        vis_image = original_image.copy()
-        _save_step_image(vis_image, f"{base_name}_step_3a_corner_verification.jpg")
-        return vis_image, contours, False
+        log.warning("   ⚠️  Warning: Could only extract %s corner points", len(corners))
+        vis_image = _save_unverified_image(original_image, base_name, save_steps, save_image)
+        return vis_image, contours, False, None, None, None
 
-    print(f"   ✓ Verifying {len(corners)} corner points")
+    log.info("   ✓ Verifying %s corner points", len(corners))
 
-    # Create visualization image
-    vis_image = original_image.copy()
+    # Create visualization image (verification itself only needs the image size)
+    vis_image = original_image.copy() if save_steps else None
 
     # Identify corner positions (TL, TR, BR, BL)
-    corner_labels = _identify_corner_positions(corners)
+    if cells is not None:
+        corner_labels = [cell['corner'] for cell in cells]
+    else:
+        corner_labels = classify_corners(corners)
+
+    # Relative tolerance and circle radius are the same for every corner
+    img_height, img_width = original_image.shape[:2]
+    diagonal = np.sqrt(img_width**2 + img_height**2)
+    tolerance = int(diagonal * config.CORNER_VERIFICATION_TOLERANCE_RATIO)
+    circle_radius = int(diagonal * config.CORNER_VERIFICATION_CIRCLE_RADIUS_RATIO)
 
-    # Verify each corner by drawing lines from adjacent corners
+    # Corner indices per label (labels may repeat when classified from coordinates)
+    label_indices = {}
+    for i, label in enumerate(corner_labels):
+        label_indices.setdefault(label, []).append(i)
+
+    # Verify each corner against lines from adjacent corners; the overlay
+    # geometry is collected and drawn in one pass afterwards
     verified_corners = []
+    verified_points = []
+    verified_labels = []
     failed_corner_labels = []
+    line_rows, line_cols, markers = [], [], []
 
     for i, (corner, label) in enumerate(zip(corners, corner_labels)):
-        is_valid = _verify_single_corner(vis_image, corner, corners, corner_labels, label, i)
+        is_valid, horizontal, vertical = _verify_single_corner(corner, corners, label_indices,
+                                                               label, i, tolerance)
+        if horizontal is not None:
+            line_rows.append(horizontal[1])
+            line_cols.append(vertical[0])
+        markers.append((corner, is_valid))
 
         if is_valid:
             verified_corners.append(contours[i])
-            print(f"   ✓ Corner {label} at {corner} passed verification")
+            verified_points.append(corner)
+            verified_labels.append(label)
+            log.info("   ✓ Corner %s at %s passed verification", label, corner)
         else:
             failed_corner_labels.append(label)
-            print(f"   ❌ Corner {label} at {corner} failed verification - marking as missing")
+            log.warning("   ❌ Corner %s at %s failed verification - marking as missing", label, corner)
+
+    if save_steps:
+        _draw_verification_overlay(vis_image, line_rows, line_cols, markers, circle_radius)
 
     # If we have failed corners, mark them as missing and request recalculation
     if failed_corner_labels:
-        print(f"   🔧 Marking {len(failed_corner_labels)} corner(s) as missing: {', '.join(failed_corner_labels)}")
+        log.info("   🔧 Marking %s corner(s) as missing: %s", len(failed_corner_labels), ', '.join(failed_corner_labels))
 
-        # Mark the first failed corner as missing for recalculation
+        # Report the first failed corner as missing for recalculation
         # (We only handle one missing corner at a time for stability)
-        import config as config_module
-        config_module.FORCE_MISSING_CORNER = failed_corner_labels[0]
-        print(f"   ↩️  Requesting recalculation with missing corner: {failed_corner_labels[0]}")
+        missing_label = failed_corner_labels[0]
+        log.info("   ↩️  Requesting recalculation with missing corner: %s", missing_label)
 
         # Save visualization and return with recalculation request
-        _save_step_image(vis_image, f"{base_name}_step_3a_corner_verification.jpg")
-        print(f"   📊 Verification result: {len(verified_corners)}/{len(contours)} corners passed - RECALCULATION NEEDED")
-        return vis_image, verified_corners, True
+        if save_steps:
+            _save_step_image(vis_image, f"{base_name}_step_3a_corner_verification.jpg", save_image)
+        log.info("   📊 Verification result: %s/%s corners passed - RECALCULATION NEEDED", len(verified_corners), len(contours))
+        return vis_image, verified_corners, True, missing_label, verified_points, verified_labels
 
     # Save visualization
-    _save_step_image(vis_image, f"{base_name}_step_3a_corner_verification.jpg")
-
-    print(f"   📊 Verification result: {len(verified_corners)}/{len(contours)} corners passed")
-
-    return vis_image, verified_corners, False
-
-
-def _extract_corners_from_contours(contours):
-    """Extract corner points from synthetic contours."""
-    corners = []
-    for contour in contours:
-        # Each synthetic contour represents a corner region
-        # Get the centroid of the contour
-        M = cv2.moments(contour)
-        if M["m00"] != 0:
-            cx = int(M["m10"] / M["m00"])
-            cy = int(M["m01"] / M["m00"])
-            corners.append((cx, cy))
-    return corners
-
-
-def _identify_corner_positions(corners):
-    """Identify which corner is TL, TR, BR, BL based on coordinates."""
-    if len(corners) < 4:
-        # If we have less than 4 corners, try to identify what we have
-        corners_array = np.array(corners)
-        center_x = np.mean(corners_array[:, 0])
-        center_y = np.mean(corners_array[:, 1])
-
-        labels = []
-        for corner in corners:
-            x, y = corner
-            if x < center_x and y < center_y:
-                labels.append("TL")
-            elif x > center_x and y < center_y:
-                labels.append("TR")
-            elif x > center_x and y > center_y:
-                labels.append("BR")
-            else:
-                labels.append("BL")
-        return labels
-
-    # Sort corners to identify TL, TR, BR, BL
-    corners_array = np.array(corners)
-
-    # Find centroid
-    center_x = np.mean(corners_array[:, 0])
-    center_y = np.mean(corners_array[:, 1])
-
-    # Classify corners based on position relative to center
-    labels = []
-    for corner in corners:
-        x, y = corner
-        if x < center_x and y < center_y:
-            labels.append("TL")
-        elif x > center_x and y < center_y:
-            labels.append("TR")
-        elif x > center_x and y > center_y:
-            labels.append("BR")
-        else:
-            labels.append("BL")
+    if save_steps:
+        _save_step_image(vis_image, f"{base_name}_step_3a_corner_verification.jpg", save_image)
 
-    return labels
+    log.info("   📊 Verification result: %s/%s corners passed", len(verified_corners), len(contours))
 
+    return vis_image, verified_corners, False, None, verified_points, verified_labels
 
-def _verify_single_corner(vis_image, corner, all_corners, corner_labels, current_label, corner_index):
+
+def _save_unverified_image(original_image, base_name, save_steps, save_image=None):
     """
-    Verify a single corner by checking if lines from adjacent corners pass through it.
+    Save the unannotated image as the step 3 visualization when verification is not possible.
+
+    Nothing is drawn, so the original itself is returned as the visualization; a
+    queued write takes its own copy.
+    """
+    if not save_steps:
+        return None
+    _save_step_image(original_image, f"{base_name}_step_3a_corner_verification.jpg", save_image)
+    return original_image
+
+
+def _verify_single_corner(corner, all_corners, label_indices, current_label, corner_index, tolerance):
+    """
+    Verify a single corner by checking if the horizontal line from its horizontal partner
+    and the vertical line from its vertical partner pass through it.
+
+    tolerance is precomputed from the image diagonal by verify_corners, and
+    label_indices maps each corner label to its indices in all_corners.
+
+    Returns:
+        tuple: (is_valid, horizontal_partner, vertical_partner); the partners are
+            None when the corner has no complete pair of partners
     """
     x, y = corner
-    img_height, img_width = vis_image.shape[:2]
-    diagonal = np.sqrt(img_width**2 + img_height**2)
 
-    # Calculate relative tolerance and circle radius
-    tolerance = int(diagonal * config.CORNER_VERIFICATION_TOLERANCE_RATIO)
-    circle_radius = int(diagonal * config.CORNER_VERIFICATION_CIRCLE_RADIUS_RATIO)
+    if current_label not in CORNER_PARTNERS:
+        return False, None, None
 
-    # Define adjacent corners for each position
-    adjacent_map = {
-        "TL": ["TR", "BL"],
-        "TR": ["TL", "BR"],
-        "BR": ["TR", "BL"],
-        "BL": ["TL", "BR"]
-    }
+    # The horizontal partner shares this corner's row, the vertical partner its column
+    horizontal_label, vertical_label = CORNER_PARTNERS[current_label]
+    horizontal = _find_partner(all_corners, label_indices, horizontal_label, corner_index)
+    vertical = _find_partner(all_corners, label_indices, vertical_label, corner_index)
 
-    if current_label not in adjacent_map:
-        return False
+    if horizontal is None or vertical is None:
+        return False, None, None
 
-    # Find adjacent corners
-    adjacent_corners = []
-    for i, label in enumerate(corner_labels):
-        if label in adjacent_map[current_label] and i != corner_index:
-            adjacent_corners.append(all_corners[i])
+    # Check the horizontal line from one partner, then (only if still needed) the
+    # vertical line from the other; corner passes if minimum lines pass through it
+    min_lines = config.CORNER_VERIFICATION_MIN_LINES
+    lines_passing = -tolerance <= y - horizontal[1] <= tolerance
+    if lines_passing < min_lines:
+        lines_passing += -tolerance <= x - vertical[0] <= tolerance
 
-    if len(adjacent_corners) < 2:
-        cv2.circle(vis_image, corner, circle_radius, config.COLOR_RED, 2)
-        return False
+    return lines_passing >= min_lines, horizontal, vertical
 
-    # Draw both horizontal and vertical lines from adjacent corners
-    lines_passing = 0
 
-    for adj_corner in adjacent_corners:
-        adj_x, adj_y = adj_corner
+def _draw_verification_overlay(vis_image, line_rows, line_cols, markers, circle_radius):
+    """
+    Draw all verification lines and corner markers in one pass (in place).
 
-        # Always draw horizontal line from adjacent corner
-        cv2.line(vis_image, (0, adj_y), (img_width, adj_y), config.COLOR_ORANGE, 1)
-        # Check if horizontal line passes through current corner
-        if abs(y - adj_y) <= tolerance:
-            lines_passing += 1
+    Args:
+        vis_image: Visualization image
+        line_rows: Rows of the horizontal lines from horizontal partners
+        line_cols: Columns of the vertical lines from vertical partners
+        markers: (corner, is_valid) per verified corner
+        circle_radius: Corner marker radius
+    """
+    img_height, img_width = vis_image.shape[:2]
 
-        # Always draw vertical line from adjacent corner
-        cv2.line(vis_image, (adj_x, 0), (adj_x, img_height), config.COLOR_LIGHT_BLUE, 1)
-        # Check if vertical line passes through current corner
-        if abs(x - adj_x) <= tolerance:
-            lines_passing += 1
+    # One polylines call per line color; markers go on top
+    if line_rows:
+        rows = [np.array([[0, row], [img_width, row]], dtype=np.int32) for row in line_rows]
+        cv2.polylines(vis_image, rows, False, config.COLOR_ORANGE, 1)
+    if line_cols:
+        cols = [np.array([[col, 0], [col, img_height]], dtype=np.int32) for col in line_cols]
+        cv2.polylines(vis_image, cols, False, config.COLOR_LIGHT_BLUE, 1)
 
-    # Corner passes if minimum lines pass through it
-    is_valid = lines_passing >= config.CORNER_VERIFICATION_MIN_LINES
+    valid_color, invalid_color = config.COLOR_GREEN, config.COLOR_RED
+    for corner, is_valid in markers:
+        cv2.circle(vis_image, corner, circle_radius, valid_color if is_valid else invalid_color, 2)
 
-    # Draw simple corner marker
-    color = config.COLOR_GREEN if is_valid else config.COLOR_RED
-    cv2.circle(vis_image, corner, circle_radius, color, 2)
 
-    return is_valid
+def _find_partner(all_corners, label_indices, label, corner_index):
+    """First corner with the given label other than the corner being verified, or None."""
+    for i in label_indices.get(label, ()):
+        if i != corner_index:
+            return all_corners[i]
+    return None
 
 
-def _save_step_image(image, filename):
+def _save_step_image(image, filename, save_image=None):
     """Save step image to configured directory with automatic overwrite."""
-    steps_path = os.path.join(config.tmp_dir, config.steps_dir)
-    # Always create directory structure (handles existing directories gracefully)
-    os.makedirs(steps_path, exist_ok=True)
-    output_path = os.path.join(steps_path, filename)
-    # cv2.imwrite automatically overwrites existing files
-    success = cv2.imwrite(output_path, image)
-    if success:
-        print(f"   💾 Saved: {output_path}")
+    save_step_image(image, filename, _write_step_image, save_image)
+
+
+def _write_step_image(output_path, image):
+    """Write a step image at the step JPEG quality (runs on the background writer)."""
+    if write_jpeg(output_path, image):
+        log.info("   💾 Saved: %s", output_path)
     else:
-        print(f"   ❌ Failed to save: {output_path}")
+        log.error("   ❌ Failed to save: %s", output_path)
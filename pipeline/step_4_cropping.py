@@ -4,12 +4,29 @@ Apply perspective transformation and crop the image based on verified corners.
 """
 
 import cv2
+import logging
 import numpy as np
 import os
+from collections import OrderedDict
 import config
+from pipeline._geom import CLOCKWISE_LABELS, clockwise_picks, contour_centers
+from pipeline._io import save_step_image, write_jpeg
 
+log = logging.getLogger(__name__)
 
-def detect_markers(contours, original_image, crop_info=None, base_name="1"):
+# Fixed-point layout used by cv2.warpPerspective / cv2.remap (INTER_BITS = 5)
+_INTER_BITS = 5
+_INTER_TAB_SIZE = 1 << _INTER_BITS
+
+# Perspective remap tables keyed by (quantized corners, output size), only used
+# when PERSPECTIVE_MAP_CACHE_SIZE > 0 (e.g. batches of scans from a fixed rig).
+# A key maps to None after its first use and to (xy, alpha) maps once it is seen
+# again, so one-off geometries never pay for building the tables.
+_perspective_maps = OrderedDict()
+
+
+def detect_markers(contours, original_image, crop_info=None, base_name="1",
+                   corner_points=None, corner_labels=None, save_image=None):
     """
     Apply perspective transformation and crop the image.
 
@@ -18,57 +35,72 @@ def detect_markers(contours, original_image, crop_info=None, base_name="1"):
         original_image: Color image for cropping
         crop_info: Not used (kept for compatibility)
         base_name: Base name for output files
+        corner_points: Optional centers of contours from Step 3; recomputed from the
+            contours when omitted
+        corner_labels: Optional corner labels matching corner_points; a complete
+            TL/TR/BR/BL set is used as the corner order instead of re-sorting
+        save_image: Optional callable(image, filename, write_func) that queues step images
+            on the running pipeline's writer; without one they are written immediately
 
     Returns:
-        tuple: (visualization_image, cropped_image)
+        tuple: (visualization_image or None, cropped_image). The visualization and
+            step images are only built in debug mode.
     """
+    save_steps = config.DEBUG_MODE
+
     if len(contours) < 3:
-        print(f"   ⚠️  Warning: Only {len(contours)} contours found, need at least 3 for cropping")
-        vis_image = original_image.copy()
-        _save_step_image(vis_image, f"{base_name}_step_4a_crop_process.jpg")
+        log.warning("   ⚠️  Warning: Only %s contours found, need at least 3 for cropping", len(contours))
+        vis_image = _save_uncropped_image(original_image, base_name, save_steps, save_image)
         return vis_image, original_image
 
-    # Extract corner points from contours
-    corners = _extract_corners_from_contours(contours)
+    # Extract corner points from contours (or take them straight from Step 3)
+    if corner_points is not None:
+        corners = list(corner_points)
+    else:
+        corners = contour_centers(contours)
 
     if len(corners) < 4:
-        print(f"   ⚠️  Warning: Could only extract {len(corners)} corner points, need 4")
-        vis_image = original_image.copy()
-        _save_step_image(vis_image, f"{base_name}_step_4a_crop_process.jpg")
+        log.warning("   ⚠️  Warning: Could only extract %s corner points, need 4", len(corners))
+        vis_image = _save_uncropped_image(original_image, base_name, save_steps, save_image)
         return vis_image, original_image
 
-    print(f"   ✓ Extracted {len(corners)} corner points from Step 3")
+    log.info("   ✓ Extracted %s corner points from Step 3", len(corners))
 
-    # Ensure we have exactly 4 corners for processing
-    working_corners = _ensure_four_corners(corners)
+    if corner_labels is not None and sorted(corner_labels) == sorted(CLOCKWISE_LABELS):
+        # Step 3 already knows which corner is which
+        sorted_corners = [corners[corner_labels.index(label)] for label in CLOCKWISE_LABELS]
+    else:
+        # Ensure we have exactly 4 corners for processing
+        working_corners = _ensure_four_corners(corners)
 
-    # Sort corners in clockwise order: TL, TR, BR, BL
-    sorted_corners = _sort_corners_clockwise(working_corners)
+        # Sort corners in clockwise order: TL, TR, BR, BL
+        sorted_corners = _sort_corners_clockwise(working_corners)
 
     # Create cropped image using perspective transformation
     cropped_image = _crop_with_perspective(original_image, sorted_corners)
 
-    # Create visualization showing the cropping process
-    vis_image = _create_crop_visualization(original_image, sorted_corners)
-
-    # Save step images
-    _save_step_image(vis_image, f"{base_name}_step_4a_crop_process.jpg")
-    _save_step_image(cropped_image, f"{base_name}_step_4b_cropped_deskewed.jpg")
+    # Create and save visualization showing the cropping process
+    vis_image = None
+    if save_steps:
+        vis_image = _create_crop_visualization(original_image, sorted_corners)
+        _save_step_image(vis_image, f"{base_name}_step_4a_crop_process.jpg", save_image)
+        _save_step_image(cropped_image, f"{base_name}_step_4b_cropped_deskewed.jpg", save_image)
 
-    print(f"   ✓ Cropped image using {len(sorted_corners)} corner points from Step 3 verified corners")
+    log.info("   ✓ Cropped image using %s corner points from Step 3 verified corners", len(sorted_corners))
     return vis_image, cropped_image
 
 
-def _extract_corners_from_contours(contours):
-    """Extract center points from contours."""
-    corners = []
-    for contour in contours:
-        M = cv2.moments(contour)
-        if M["m00"] != 0:
-            cx = int(M["m10"] / M["m00"])
-            cy = int(M["m01"] / M["m00"])
-            corners.append((cx, cy))
-    return corners
+def _save_uncropped_image(original_image, base_name, save_steps, save_image=None):
+    """
+    Save the unannotated image as the step 4 visualization when cropping is not possible.
+
+    Nothing is drawn, so the original itself is returned as the visualization; a
+    queued write takes its own copy.
+    """
+    if not save_steps:
+        return None
+    _save_step_image(original_image, f"{base_name}_step_4a_crop_process.jpg", save_image)
+    return original_image
 
 
 def _ensure_four_corners(corners):
@@ -77,58 +109,22 @@ def _ensure_four_corners(corners):
     if len(working_corners) == 3:
         # Duplicate one corner to make sorting algorithms work
         working_corners.append(working_corners[-1])
-        print(f"   🔧 Padded to 4 corners for processing (last corner duplicated)")
+        log.info("   🔧 Padded to 4 corners for processing (last corner duplicated)")
     return working_corners
 
 
 def _sort_corners_clockwise(corners):
     """Sort corner points in clockwise order: TL, TR, BR, BL."""
-    points = np.array(corners)
-    center_x = np.mean(points[:, 0])
-    center_y = np.mean(points[:, 1])
-
-    # Group points by quadrant
-    quadrants = {'TL': [], 'TR': [], 'BR': [], 'BL': []}
-
-    for point in corners:
-        x, y = point
-        if x <= center_x and y <= center_y:
-            quadrants['TL'].append(point)
-        elif x > center_x and y <= center_y:
-            quadrants['TR'].append(point)
-        elif x > center_x and y > center_y:
-            quadrants['BR'].append(point)
-        else:
-            quadrants['BL'].append(point)
-
     # Select best candidate from each quadrant
-    sorted_corners = []
-
-    # Top-left: minimize distance to (0,0)
-    if quadrants['TL']:
-        tl = min(quadrants['TL'], key=lambda p: p[0] + p[1])
-        sorted_corners.append(tl)
-
-    # Top-right: maximize x, minimize y
-    if quadrants['TR']:
-        tr = max(quadrants['TR'], key=lambda p: p[0] - p[1])
-        sorted_corners.append(tr)
-
-    # Bottom-right: maximize distance from (0,0)
-    if quadrants['BR']:
-        br = max(quadrants['BR'], key=lambda p: p[0] + p[1])
-        sorted_corners.append(br)
-
-    # Bottom-left: minimize x, maximize y
-    if quadrants['BL']:
-        bl = min(quadrants['BL'], key=lambda p: p[1] - p[0])
-        sorted_corners.append(bl)
+    sorted_corners = [corners[i] for i in clockwise_picks(corners)]
 
     # Fill with remaining points if needed
     if len(sorted_corners) < 4:
+        seen = {tuple(point) for point in sorted_corners}
         for point in corners:
-            if point not in sorted_corners:
+            if tuple(point) not in seen:
                 sorted_corners.append(point)
+                seen.add(tuple(point))
                 if len(sorted_corners) == 4:
                     break
 
@@ -151,22 +147,81 @@ def _crop_with_perspective(image, corners):
         [0, config.OUTPUT_HEIGHT - 1]             # Bottom-left
     ], dtype=np.float32)
 
+    cache_size = config.PERSPECTIVE_MAP_CACHE_SIZE
+    if cache_size <= 0:
+        transform_matrix = cv2.getPerspectiveTransform(src_points, dst_points)
+        return cv2.warpPerspective(image, transform_matrix, (config.OUTPUT_WIDTH, config.OUTPUT_HEIGHT),
+                                   flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+    # Reuse cached remap tables for a repeated corner geometry
+    quantum = config.PERSPECTIVE_MAP_QUANTUM
+    if quantum > 1:
+        src_points = (np.round(src_points / quantum) * quantum).astype(np.float32)
+    key = (tuple(src_points.ravel().tolist()), config.OUTPUT_WIDTH, config.OUTPUT_HEIGHT)
+    maps = _perspective_maps.get(key)
+    if maps is not None:
+        _perspective_maps.move_to_end(key)
+        return cv2.remap(image, maps[0], maps[1], cv2.INTER_LINEAR,
+                         borderMode=cv2.BORDER_CONSTANT)
+
     # Calculate and apply perspective transformation
     transform_matrix = cv2.getPerspectiveTransform(src_points, dst_points)
-    cropped = cv2.warpPerspective(image, transform_matrix, (config.OUTPUT_WIDTH, config.OUTPUT_HEIGHT))
+    cropped = cv2.warpPerspective(image, transform_matrix, (config.OUTPUT_WIDTH, config.OUTPUT_HEIGHT),
+                                  flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+    if key in _perspective_maps:
+        _perspective_maps[key] = _build_perspective_maps(
+            transform_matrix, config.OUTPUT_WIDTH, config.OUTPUT_HEIGHT)
+        _perspective_maps.move_to_end(key)
+    else:
+        _perspective_maps[key] = None
+    while len(_perspective_maps) > cache_size:
+        _perspective_maps.popitem(last=False)
 
     return cropped
 
 
+def _build_perspective_maps(transform_matrix, width, height):
+    """
+    Build fixed-point remap tables reproducing cv2.warpPerspective exactly.
+
+    Args:
+        transform_matrix (numpy.ndarray): 3x3 source-to-output perspective matrix
+        width (int): Output width
+        height (int): Output height
+
+    Returns:
+        tuple: (xy, alpha) maps for cv2.remap with INTER_LINEAR
+    """
+    # warpPerspective samples through the inverse matrix in double precision
+    _, inverse = cv2.invert(transform_matrix.astype(np.float64))
+    xs = np.arange(width, dtype=np.float64)
+    ys = np.arange(height, dtype=np.float64)[:, None]
+
+    w = inverse[2, 0] * xs + inverse[2, 1] * ys + inverse[2, 2]
+    with np.errstate(divide='ignore'):
+        w = np.where(w != 0, _INTER_TAB_SIZE / w, 0)
+    fx = (inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2]) * w
+    fy = (inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2]) * w
+    x = np.rint(np.clip(fx, -2**31, 2**31 - 1)).astype(np.int64)
+    y = np.rint(np.clip(fy, -2**31, 2**31 - 1)).astype(np.int64)
+
+    xy = np.empty((height, width, 2), dtype=np.int16)
+    xy[..., 0] = np.clip(x >> _INTER_BITS, -32768, 32767)
+    xy[..., 1] = np.clip(y >> _INTER_BITS, -32768, 32767)
+    mask = _INTER_TAB_SIZE - 1
+    alpha = ((y & mask) * _INTER_TAB_SIZE + (x & mask)).astype(np.uint16)
+    return xy, alpha
+
+
 def _create_crop_visualization(original_image, corners):
     """Create visualization showing the cropping process."""
     vis_image = original_image.copy()
 
     # Draw corner points with different colors
     colors = [config.COLOR_RED, config.COLOR_GREEN, config.COLOR_BLUE, config.COLOR_PINK]
-    labels = ["TL", "TR", "BR", "BL"]
 
-    for i, (corner, color, label) in enumerate(zip(corners, colors, labels)):
+    for i, (corner, color, label) in enumerate(zip(corners, colors, CLOCKWISE_LABELS)):
         x, y = int(corner[0]), int(corner[1])
 
         # Draw corner point
@@ -179,10 +234,8 @@ def _create_crop_visualization(original_image, corners):
 
     # Draw quadrilateral connecting the corners
     if len(corners) >= 4:
-        unique_corners = []
-        for corner in corners:
-            if not unique_corners or corner != unique_corners[-1]:
-                unique_corners.append(corner)
+        # Drop repeated corners (e.g. a padded duplicate), keeping their order
+        unique_corners = list(dict.fromkeys(tuple(corner) for corner in corners))
 
         if len(unique_corners) >= 3:
             pts = np.array(unique_corners + [unique_corners[0]], dtype=np.int32)
@@ -191,17 +244,17 @@ def _create_crop_visualization(original_image, corners):
     return vis_image
 
 
-def _save_step_image(image, filename):
+def _save_step_image(image, filename, save_image=None):
     """Save step image to configured directory with automatic overwrite."""
-    steps_path = os.path.join(config.tmp_dir, config.steps_dir)
-    # Always create directory structure (handles existing directories gracefully)
-    os.makedirs(steps_path, exist_ok=True)
-    path = os.path.join(steps_path, filename)
-    # cv2.imwrite automatically overwrites existing files
-    success = cv2.imwrite(path, image)
-    if success:
+    save_step_image(image, filename, _write_step_image, save_image)
+
+
+def _write_step_image(path, image):
+    """Write a step image at the step JPEG quality (runs on the background writer)."""
+    if write_jpeg(path, image):
+        filename = os.path.basename(path)
         step_type = 'a' if 'process' in filename else 'b'
         description = 'Crop process visualization' if 'process' in filename else 'Final cropped result'
-        print(f"   💾 Step 4{step_type}: {description} saved to {path}")
+        log.info("   💾 Step 4%s: %s saved to %s", step_type, description, path)
     else:
-        print(f"   ❌ Step 4: Failed to save {path}")
+        log.error("   ❌ Step 4: Failed to save %s", path)
@@ -0,0 +1,184 @@
+"""
+Shared Test Helpers
+Image comparison, reference lookup and worker setup used by every test suite.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import OMRPipeline, configure_logging
+from pipeline._jit import NUMBA_AVAILABLE, njit
+import config
+
+
+def images_match(img1_path, img2_path):
+    """Check if two images match exactly.
+
+    Byte-identical files match without decoding; otherwise the decoded pixels decide.
+    """
+    try:
+        # Fast path: compare file hashes (the reference digest comes from the manifest)
+        if reference_sha256(img1_path) == file_sha256(img2_path):
+            return True
+
+        # Images with different header dimensions cannot match; skip decoding them
+        # (reading both headers also catches a missing reference)
+        size1, size2 = jpeg_size(img1_path), jpeg_size(img2_path)
+        if size1 and size2 and size1 != size2:
+            return False
+    except FileNotFoundError:
+        return False
+
+    # Load both images at once (OpenCV releases the GIL while decoding)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        img1, img2 = pool.map(read_image, (img1_path, img2_path))
+
+    if img1 is None or img2 is None:
+        return False
+
+    # Check if dimensions match
+    if img1.shape != img2.shape:
+        return False
+
+    # Check if images are identical (both comparisons stop at the first difference)
+    if NUMBA_AVAILABLE:
+        return _pixels_equal(img1.ravel(), img2.ravel())
+    return img1.tobytes() == img2.tobytes()
+
+
+def read_image(path):
+    """Decode an image from a single read of its file, or None if it cannot be decoded."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+@njit(cache=True)
+def _pixels_equal(a, b):
+    """Numba kernel: compare two equally sized flat arrays, stopping at the first difference."""
+    for i in range(a.size):
+        if a[i] != b[i]:
+            return False
+    return True
+
+
+def file_sha256(path):
+    """SHA-256 of a file's bytes."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Reference digests from manifest.json, loaded once per references directory
+_manifests = {}
+
+
+def load_manifest(references_dir):
+    """Reference name -> SHA-256 from references_dir/manifest.json, or {}."""
+    if references_dir not in _manifests:
+        try:
+            _manifests[references_dir] = json.loads((references_dir / "manifest.json").read_text())
+        except (OSError, ValueError):
+            _manifests[references_dir] = {}
+    return _manifests[references_dir]
+
+
+# Digests of references missing from the manifest, keyed on path, size and mtime
+_reference_digests = {}
+
+
+def reference_sha256(path):
+    """
+    SHA-256 of a reference image from the manifest, so references are not read at all.
+
+    generate_references.py is the only writer of the references and hashes the bytes it
+    saves into the manifest, so its digests are trusted. A reference missing from the
+    manifest is hashed once per process.
+    """
+    digest = load_manifest(Path(path).parent).get(os.path.basename(path))
+    if digest:
+        return digest
+
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _reference_digests:
+        _reference_digests[key] = file_sha256(path)
+    return _reference_digests[key]
+
+
+# JPEG start-of-frame markers (SOF0-SOF15 except DHT, JPG and DAC)
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(path):
+    """(width, height) from a JPEG's frame header without decoding it, or None if not found."""
+    with open(path, 'rb') as f:
+        if f.read(2) != b'\xff\xd8':
+            return None
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            code = marker[1]
+            if code == 0x01 or 0xD0 <= code <= 0xD7:
+                continue  # Standalone markers carry no length
+            length = f.read(2)
+            if len(length) < 2:
+                return None
+            if code in _SOF_MARKERS:
+                header = f.read(5)
+                if len(header) < 5:
+                    return None
+                return int.from_bytes(header[3:5], 'big'), int.from_bytes(header[1:3], 'big')
+            f.seek(int.from_bytes(length, 'big') - 2, os.SEEK_CUR)
+
+
+def find_input_image(input_dir, stem):
+    """Path of the first {stem}{ext} in input_dir for config.SUPPORTED_EXTENSIONS (one directory read), or None."""
+    try:
+        names = set(os.listdir(input_dir))
+    except OSError:
+        return None
+    for ext in config.SUPPORTED_EXTENSIONS:
+        if f"{stem}{ext}" in names:
+            return str(Path(input_dir) / f"{stem}{ext}")
+    return None
+
+
+# One pipeline is reused across test cases so its setup is paid once
+_pipeline = None
+
+
+def get_pipeline(image_path):
+    """Return the shared pipeline pointed at image_path."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = OMRPipeline(str(image_path), debug=config.DEBUG_MODE)
+    else:
+        _pipeline.set_input(str(image_path))
+    return _pipeline
+
+
+def worker_count(total_tests):
+    """Worker processes for a test run: half the CPU cores, at most one per test."""
+    return max(1, min(total_tests, (os.cpu_count() or 2) // 2))
+
+
+def worker_pool(workers):
+    """Process pool whose workers fork from a server that already imported the pipeline (where supported)."""
+    if 'forkserver' in mp.get_all_start_methods():
+        context = mp.get_context('forkserver')
+        context.set_forkserver_preload(['main'])
+        return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=configure_logging)
+    return ProcessPoolExecutor(max_workers=workers, initializer=configure_logging)
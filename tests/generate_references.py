@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Reference Generator
+Runs the pipeline on every test input, copies the cropped outputs into
+tests/references/ and writes tests/references/manifest.json with the SHA-256
+of each reference, which the tests trust instead of reading the references
+(rerun with --manifest-only after changing a reference by hand).
+
+Usage:
+    python tests/generate_references.py                  # Regenerate references and manifest
+    python tests/generate_references.py --manifest-only  # Rehash the existing references
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import OMRPipeline, configure_logging
+import config
+
+INPUT_DIR = Path("tests/input")
+REFERENCES_DIR = Path("tests/references")
+OUTPUT_DIR = Path("tmp/output")
+MANIFEST_PATH = REFERENCES_DIR / "manifest.json"
+
+# (input image, forced missing corner, pipeline output name, reference name)
+REFERENCE_CASES = (
+    [(f"{n}.jpg", None, f"{n}_cropped.jpg", f"{n}-cropped.jpg") for n in range(1, 6)]
+    + [("1.jpg", corner, f"1_missing_{corner.lower()}_cropped.jpg", f"1-{corner.lower()}-missing-cropped.jpg")
+       for corner in ['TL', 'TR', 'BL', 'BR']]
+    + [("br-missing.jpeg", corner, f"br-missing_missing_{corner.lower()}_cropped.jpg",
+        f"br-missing-{corner.lower()}-missing-cropped.jpg") for corner in ['TL', 'TR', 'BL']]
+    + [("bad-corner.jpg", None, "bad-corner_cropped.jpg", "bad-corner-cropped.jpg"),
+       ("br-missing.jpeg", None, "br-missing_cropped.jpg", "br-missing-cropped.jpg")]
+)
+
+
+def generate_reference(image_name, missing_corner, output_name, reference_name):
+    """Run the pipeline on one input and copy its cropped output to the references."""
+    print(f"📸 Generating: {reference_name}")
+
+    config.ENABLE_MISSING_CORNER_CALCULATION = missing_corner is not None
+    config.FORCE_MISSING_CORNER = missing_corner
+
+    pipeline = OMRPipeline(str(INPUT_DIR / image_name), debug=config.DEBUG_MODE)
+    if not pipeline.run_pipeline():
+        print(f"   ❌ FAILED - Pipeline processing failed for {image_name}")
+        return False
+
+    output_path = OUTPUT_DIR / output_name
+    if not output_path.exists():
+        print(f"   ❌ FAILED - Output image not found: {output_path}")
+        return False
+
+    shutil.copyfile(output_path, REFERENCES_DIR / reference_name)
+    print(f"   ✅ Saved: {REFERENCES_DIR / reference_name}")
+    return True
+
+
+def write_manifest():
+    """Write manifest.json with the SHA-256 of every reference image."""
+    manifest = {}
+    for path in sorted(REFERENCES_DIR.glob("*.jpg")):
+        manifest[path.name] = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    print(f"📝 Wrote {MANIFEST_PATH} ({len(manifest)} references)")
+
+
+def main():
+    """Regenerate the reference images (unless --manifest-only) and their manifest."""
+    REFERENCES_DIR.mkdir(parents=True, exist_ok=True)
+
+    success = True
+    if "--manifest-only" not in sys.argv[1:]:
+        for case in REFERENCE_CASES:
+            success = generate_reference(*case) and success
+        config.ENABLE_MISSING_CORNER_CALCULATION = False
+        config.FORCE_MISSING_CORNER = None
+
+    write_manifest()
+    return success
+
+
+if __name__ == "__main__":
+    configure_logging()
+    sys.exit(0 if main() else 1)
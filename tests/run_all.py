@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Run All Tests
+Runs every test suite in one process so the pipeline and OpenCV are imported once.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(TESTS_DIR))
+sys.path.append(TESTS_DIR)
+
+import config
+from main import configure_logging
+import test_normal
+import test_missing_corners
+import test_bad_corner
+import test_actual_missing
+
+SUITES = [test_normal, test_missing_corners, test_bad_corner, test_actual_missing]
+
+# Settings the suites change while they run
+_SUITE_SETTING_NAMES = ('ENABLE_MISSING_CORNER_CALCULATION', 'FORCE_MISSING_CORNER')
+
+
+@contextmanager
+def config_snapshot():
+    """Restore the settings the suites change once the block exits."""
+    saved = {name: getattr(config, name) for name in _SUITE_SETTING_NAMES}
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def run_all():
+    """Run every suite in turn and report which ones passed."""
+    start_time = time.perf_counter()
+    results = {}
+
+    for suite in SUITES:
+        print(f"\n▶️  {suite.__name__}")
+        with config_snapshot():
+            results[suite.__name__] = suite.run_tests()
+
+    total_time = time.perf_counter() - start_time
+    print("\n" + "=" * 60)
+    print("📊 ALL SUITES")
+    print("=" * 60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name}")
+    print(f"⏱️  Total time: {total_time:.2f} seconds")
+
+    return all(results.values())
+
+
+if __name__ == "__main__":
+    configure_logging()
+    success = run_all()
+    sys.exit(0 if success else 1)
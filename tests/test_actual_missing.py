@@ -8,35 +8,15 @@ the pipeline can handle real-world scenarios where corners are truly absent.
 import os
 import sys
 import time
-import cv2
-import numpy as np
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import OMRPipeline
+from main import configure_logging
+from _support import get_pipeline, images_match
 import config
 
 
-def images_match(img1_path, img2_path):
-    """Check if two images match exactly."""
-    if not os.path.exists(img1_path) or not os.path.exists(img2_path):
-        return False
-
-    img1 = cv2.imread(img1_path)
-    img2 = cv2.imread(img2_path)
-
-    if img1 is None or img2 is None:
-        return False
-
-    # Check if dimensions match
-    if img1.shape != img2.shape:
-        return False
-
-    # Check if images are identical
-    return np.array_equal(img1, img2)
-
-
 def test_actual_missing_corner(image_name, expected_missing_corner=None):
     """Test an image with an actual missing corner."""
     input_dir = Path("tests/input")
@@ -58,8 +38,8 @@ def test_actual_missing_corner(image_name, expected_missing_corner=None):
         config.ENABLE_MISSING_CORNER_CALCULATION = False
         config.FORCE_MISSING_CORNER = None
 
-        # Create pipeline instance
-        pipeline = OMRPipeline(str(image_path), debug=config.DEBUG_MODE)
+        # Point the shared pipeline at this image
+        pipeline = get_pipeline(image_path)
 
         # Process the image
         success = pipeline.run_pipeline()
@@ -121,7 +101,7 @@ def run_tests():
     print(f"🧪 Starting Actual Missing Corner Tests")
     print("=" * 60)
 
-    start_time = time.time()
+    start_time = time.perf_counter()
     successful_tests = 0
     failed_tests = 0
     total_tests = len(test_cases)
@@ -136,7 +116,7 @@ def run_tests():
             failed_tests += 1
 
     # Print summary
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
     print("\n" + "=" * 60)
     print("📊 TEST SUMMARY")
     print("=" * 60)
@@ -157,5 +137,6 @@ def run_tests():
 
 
 if __name__ == "__main__":
+    configure_logging()
     success = run_tests()
     sys.exit(0 if success else 1)
@@ -8,47 +8,22 @@ and compares the output with the expected reference image.
 import os
 import sys
 import time
-import cv2
-import numpy as np
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import OMRPipeline
+from main import configure_logging
+from _support import find_input_image, get_pipeline, images_match
 import config
 
 
-def images_match(img1_path, img2_path):
-    """Check if two images match exactly."""
-    if not os.path.exists(img1_path) or not os.path.exists(img2_path):
-        return False
-
-    img1 = cv2.imread(img1_path)
-    img2 = cv2.imread(img2_path)
-
-    if img1 is None or img2 is None:
-        return False
-
-    # Check if dimensions match
-    if img1.shape != img2.shape:
-        return False
-
-    # Check if images are identical
-    return np.array_equal(img1, img2)
-
-
 def test_bad_corner_image():
     """Test bad corner detection using bad-corner.jpg."""
     input_dir = Path("tests/input")
     references_dir = Path("tests/references")
 
     # Look for bad-corner image
-    image_path = None
-    for ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-        test_path = input_dir / f"bad-corner{ext}"
-        if test_path.exists():
-            image_path = str(test_path)
-            break
+    image_path = find_input_image(input_dir, "bad-corner")
 
     if not image_path:
         print(f"❌ bad-corner.* not found in tests/input/")
@@ -61,11 +36,11 @@ def test_bad_corner_image():
         config.ENABLE_MISSING_CORNER_CALCULATION = False
         config.FORCE_MISSING_CORNER = None
 
-        # Create pipeline instance and run
-        pipeline = OMRPipeline(image_path, debug=config.DEBUG_MODE)
-        start_time = time.time()
+        # Point the shared pipeline at this image and run
+        pipeline = get_pipeline(image_path)
+        start_time = time.perf_counter()
         success = pipeline.run_pipeline()
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         if not success:
             print(f"   ❌ FAILED - Pipeline processing failed")
@@ -105,7 +80,7 @@ def run_tests():
     print("🧪 Starting Bad Corner Detection Tests")
     print("=" * 60)
 
-    start_time = time.time()
+    start_time = time.perf_counter()
     tests_run = 0
     tests_passed = 0
 
@@ -116,7 +91,7 @@ def run_tests():
         tests_passed += 1
 
     # Print summary
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
     print("\n" + "=" * 60)
     print("📊 TEST SUMMARY")
     print("=" * 60)
@@ -131,5 +106,6 @@ def run_tests():
 
 
 if __name__ == "__main__":
+    configure_logging()
     success = run_tests()
     sys.exit(0 if success else 1)
@@ -7,47 +7,22 @@ Tests missing corner scenarios for image 1 only and compares against reference i
 import os
 import sys
 import time
-import cv2
-import numpy as np
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import OMRPipeline
+from main import OMRPipeline, configure_logging
+from _support import find_input_image, images_match, worker_count, worker_pool
 import config
 
 
-def images_match(img1_path, img2_path):
-    """Check if two images match exactly."""
-    if not os.path.exists(img1_path) or not os.path.exists(img2_path):
-        return False
-
-    img1 = cv2.imread(img1_path)
-    img2 = cv2.imread(img2_path)
-
-    if img1 is None or img2 is None:
-        return False
-
-    # Check if dimensions match
-    if img1.shape != img2.shape:
-        return False
-
-    # Check if images are identical
-    return np.array_equal(img1, img2)
-
-
 def test_missing_corner(image_number, missing_corner):
     """Test a single image with a specific missing corner."""
     input_dir = Path("tests/input")
     references_dir = Path("tests/references")
 
     # Find the image file - look for {number}.{extension} pattern
-    image_path = None
-    for ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-        test_path = input_dir / f"{image_number}{ext}"
-        if test_path.exists():
-            image_path = str(test_path)
-            break
+    image_path = find_input_image(input_dir, image_number)
 
     if not image_path:
         print(f"❌ Image {image_number}.* not found in tests/input/")
@@ -105,32 +80,37 @@ def test_missing_corner(image_number, missing_corner):
 
 
 def run_tests():
-    """Run missing corner tests for image 1."""
-    # Test image number - easily editable for debugging
-    test_image = 1  # Change this to test different images
-
-    # Missing corner scenarios to test
-    missing_corners = ['TL', 'TR', 'BL', 'BR']
-
-    print(f"🧪 Starting Missing Corner Tests (Image {test_image})")
+    """Run missing corner tests for image 1 and br-missing."""
+    # (image, forced missing corner) scenarios - easily editable for debugging
+    scenarios = [(1, corner) for corner in ['TL', 'TR', 'BL', 'BR']]
+    # br-missing's calculated corners land on the image border, where the corner point
+    # must be the centroid of the edge-clamped marker contour
+    scenarios += [('br-missing', corner) for corner in ['TL', 'TR', 'BL']]
+
+    print(f"🧪 Starting Missing Corner Tests (Images {', '.join(dict.fromkeys(str(image) for image, _ in scenarios))})")
     print("=" * 60)
 
-    start_time = time.time()
-    successful_tests = 0
-    failed_tests = 0
-    total_tests = len(missing_corners)
-
-    # Test each missing corner scenario
-    for i, corner in enumerate(missing_corners, 1):
-        print(f"\n🔄 Test {i}/{total_tests} - Missing {corner}:")
-
-        if test_missing_corner(test_image, corner):
-            successful_tests += 1
-        else:
-            failed_tests += 1
+    start_time = time.perf_counter()
+    total_tests = len(scenarios)
+    workers = worker_count(total_tests)
+
+    if workers > 1:
+        # Each scenario writes its own output files, so the tests run in worker processes
+        # (their progress output interleaves)
+        with worker_pool(workers) as pool:
+            results = list(pool.map(test_missing_corner, *zip(*scenarios)))
+    else:
+        # Test each missing corner scenario
+        results = []
+        for i, (image, corner) in enumerate(scenarios, 1):
+            print(f"\n🔄 Test {i}/{total_tests} - Image {image}, missing {corner}:")
+            results.append(test_missing_corner(image, corner))
+
+    successful_tests = sum(results)
+    failed_tests = total_tests - successful_tests
 
     # Print summary
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
     print("\n" + "=" * 60)
     print("📊 TEST SUMMARY")
     print("=" * 60)
@@ -145,5 +125,6 @@ def run_tests():
 
 
 if __name__ == "__main__":
+    configure_logging()
     success = run_tests()
     sys.exit(0 if success else 1)
@@ -7,47 +7,22 @@ Tests images 1-7 with normal processing and compares against reference images.
 import os
 import sys
 import time
-import cv2
-import numpy as np
 from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import OMRPipeline
+from main import OMRPipeline, configure_logging
+from _support import find_input_image, images_match, worker_count, worker_pool
 import config
 
 
-def images_match(img1_path, img2_path):
-    """Check if two images match exactly."""
-    if not os.path.exists(img1_path) or not os.path.exists(img2_path):
-        return False
-
-    img1 = cv2.imread(img1_path)
-    img2 = cv2.imread(img2_path)
-
-    if img1 is None or img2 is None:
-        return False
-
-    # Check if dimensions match
-    if img1.shape != img2.shape:
-        return False
-
-    # Check if images are identical
-    return np.array_equal(img1, img2)
-
-
 def test_single_image(image_number):
     """Test a single image with normal processing."""
     input_dir = Path("tests/input")
     references_dir = Path("tests/references")
 
     # Find the image file - look for {number}.{extension} pattern
-    image_path = None
-    for ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-        test_path = input_dir / f"{image_number}{ext}"
-        if test_path.exists():
-            image_path = str(test_path)
-            break
+    image_path = find_input_image(input_dir, image_number)
 
     if not image_path:
         print(f"❌ Image {image_number}.* not found in tests/input/")
@@ -108,22 +83,27 @@ def run_tests():
     print(f"🧪 Starting Normal Pipeline Tests (Images {min(test_range)}-{max(test_range)})")
     print("=" * 60)
 
-    start_time = time.time()
-    successful_tests = 0
-    failed_tests = 0
+    start_time = time.perf_counter()
     total_tests = len(test_range)
-
-    # Test images in specified range
-    for image_num in test_range:
-        print(f"\n🔄 Test {image_num}/{max(test_range)}:")
-
-        if test_single_image(image_num):
-            successful_tests += 1
-        else:
-            failed_tests += 1
+    workers = worker_count(total_tests)
+
+    if workers > 1:
+        # Each image writes its own output files, so the tests run in worker processes
+        # (their progress output interleaves)
+        with worker_pool(workers) as pool:
+            results = list(pool.map(test_single_image, test_range))
+    else:
+        # Test images in specified range
+        results = []
+        for image_num in test_range:
+            print(f"\n🔄 Test {image_num}/{max(test_range)}:")
+            results.append(test_single_image(image_num))
+
+    successful_tests = sum(results)
+    failed_tests = total_tests - successful_tests
 
     # Print summary
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
     print("\n" + "=" * 60)
     print("📊 TEST SUMMARY")
     print("=" * 60)
@@ -138,5 +118,6 @@ def run_tests():
 
 
 if __name__ == "__main__":
+    configure_logging()
     success = run_tests()
     sys.exit(0 if success else 1)